@@ -1 +1,27 @@
-# Nutrafol Product Scraper
\ No newline at end of file
+# Nutrafol Product Scraper
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import catalog, regimenpro, specs
+
+catalog.enable()
+regimenpro.enable()
+
+# File paths (update to your local file locations)
+input_csv = "/Users/sarahmorrison/Desktop/RegimenPro/productScraper/Nutrafol/nutrafol_product_urls.csv"
+output_csv = "/Users/sarahmorrison/Desktop/Nutrafol_Scraped_Products.csv"
+comparison_csv = "/Users/sarahmorrison/Desktop/Nutrafol_comparison.csv"
+
+# Not customized yet: the Shopify <url>.json source and SHOPIFY_FIELDS, compared exactly
+SPEC = {
+    "brand": "Nutrafol",
+    "input_csv": input_csv,
+    "output_csv": output_csv,
+    "comparison_csv": comparison_csv,
+}
+
+PLAN = specs.compile_plan(SPEC)
+
+if __name__ == "__main__":
+    specs.run(PLAN)
@@ -0,0 +1 @@
+# Shared helpers used by every brand scraper in productScraper/
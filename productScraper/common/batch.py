@@ -0,0 +1,37 @@
+# === Batch comparison ===
+# The compared pairs of a batch of products (output.WRITE_BATCH) are matched
+# together a column at a time: prices as integer cents and every other column
+# by its normalized keys. Only pairs whose keys differ reach the column's own
+# matcher, so the fuzzy and list matchers score just the mismatches.
+
+
+def equal_flags(keys1, keys2):
+    # Whether each pair of keys is equal
+    return [a == b for a, b in zip(keys1, keys2)]
+
+
+def price_flags(cents1, cents2):
+    # (equal, valid) per pair of prices in cents, None for an unreadable price
+    valid = [a is not None and b is not None for a, b in zip(cents1, cents2)]
+    return equal_flags(cents1, cents2), valid
+
+
+def match(pairs, matchers, labels):
+    # "Match?" text of each (column, key1, key2), in order
+    by_column = {}
+    for i, (column, key1, key2) in enumerate(pairs):
+        by_column.setdefault(column, []).append(i)
+
+    results = [None] * len(pairs)
+    for column, indexes in by_column.items():
+        _, slow_match, kind = matchers[column]
+        keys1 = [pairs[i][1] for i in indexes]
+        keys2 = [pairs[i][2] for i in indexes]
+        if kind == "price":
+            equal, valid = price_flags(keys1, keys2)
+            for i, same, ok in zip(indexes, equal, valid):
+                results[i] = labels["invalid"] if not ok else labels["yes"] if same else labels["no"]
+            continue
+        for i, same in zip(indexes, equal_flags(keys1, keys2)):
+            results[i] = labels["yes"] if same else slow_match(pairs[i][1], pairs[i][2], labels)
+    return results
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import sys
+import zlib
+
+from common import fetch
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# === Raw document blobs ===
+# The raw body_html and page body behind each product are kept once each, under
+# the SHA-256 of their bytes, so storage grows with content changes rather than
+# with runs; the results store (common.store) only records the hashes. Blobs are
+# zstd-compressed with a dictionary trained on earlier blobs, or compressed with
+# zlib using the dictionary's last 32 KiB as its preset when zstandard is not
+# installed. Every blob names its codec and dictionary, so old blobs stay
+# readable after the dictionary is retrained. A dictionary is trained once
+# DICT_MIN_SAMPLES blobs exist; retrain or read blobs with:
+#   cd productScraper && python -m common.blobs train
+#   python -m common.blobs cat <hash> > page.html
+BLOBS_ENABLED = os.environ.get("SCRAPER_BLOBS", "1") == "1"
+BLOB_DIR = os.environ.get("SCRAPER_BLOB_DIR", os.path.join(fetch.DATA_DIR, "blobs"))
+DICT_DIR = os.path.join(BLOB_DIR, "dictionaries")
+ZSTD_LEVEL = 12
+ZLIB_LEVEL = 9
+ZLIB_WINDOW = 32 * 1024
+DICT_SIZE = 110 * 1024
+DICT_SAMPLES = 2000
+DICT_MIN_SAMPLES = 100
+
+# Dictionary id -> bytes, loaded at most once per process
+_dictionaries = {}
+_current = []
+
+
+def digest_of(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def blob_path(digest):
+    return os.path.join(BLOB_DIR, digest[:2], digest)
+
+
+def dictionary(dict_id):
+    if dict_id not in _dictionaries:
+        with open(os.path.join(DICT_DIR, dict_id + ".dict"), "rb") as f:
+            _dictionaries[dict_id] = f.read()
+    return _dictionaries[dict_id]
+
+
+def current_dictionary():
+    # Id of the dictionary new blobs are compressed with, or None
+    if not _current:
+        try:
+            with open(os.path.join(DICT_DIR, "current")) as f:
+                _current.append(f.read().strip() or None)
+        except FileNotFoundError:
+            _current.append(None)
+    return _current[0]
+
+
+def compress(data, dict_id):
+    if zstandard is not None:
+        dict_data = zstandard.ZstdCompressionDict(dictionary(dict_id)) if dict_id else None
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    if dict_id:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary(dict_id)[-ZLIB_WINDOW:])
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL)
+    return "zlib", compressor.compress(data) + compressor.flush()
+
+
+def decompress(codec, dict_id, payload):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed; it is needed to read zstd blobs")
+        dict_data = zstandard.ZstdCompressionDict(dictionary(dict_id)) if dict_id else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+    if codec == "zlib":
+        if dict_id:
+            decompressor = zlib.decompressobj(zdict=dictionary(dict_id)[-ZLIB_WINDOW:])
+        else:
+            decompressor = zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+    raise ValueError(f"Unknown blob codec: {codec}")
+
+
+def write_file(path, data):
+    # Written beside the target and renamed into place, so a blob is never half there
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "wb") as f:
+        f.write(data)
+    os.replace(partial_path, path)
+
+
+def put(data):
+    # Hash of data (str or bytes), stored unless a blob with that hash exists
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    digest = digest_of(data)
+    path = blob_path(digest)
+    if not os.path.exists(path):
+        dict_id = current_dictionary()
+        codec, payload = compress(data, dict_id)
+        write_file(path, f"{codec} {dict_id or '-'}\n".encode() + payload)
+    return digest
+
+
+def get(digest):
+    with open(blob_path(digest), "rb") as f:
+        header, payload = f.read().split(b"\n", 1)
+    codec, dict_id = header.decode().split(" ")
+    return decompress(codec, None if dict_id == "-" else dict_id, payload)
+
+
+def blob_paths():
+    for prefix in os.listdir(BLOB_DIR) if os.path.isdir(BLOB_DIR) else []:
+        folder = os.path.join(BLOB_DIR, prefix)
+        if len(prefix) != 2 or not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            if not name.endswith(".partial"):
+                yield os.path.join(folder, name)
+
+
+def train(samples=DICT_SAMPLES):
+    # Trains a dictionary on the newest `samples` blobs and makes it current;
+    # its id, or None when there are too few blobs
+    paths = sorted(blob_paths(), key=os.path.getmtime)[-samples:]
+    if len(paths) < DICT_MIN_SAMPLES:
+        return None
+    data = [get(os.path.basename(path)) for path in paths]
+    trained = None
+    if zstandard is not None:
+        try:
+            trained = zstandard.train_dictionary(DICT_SIZE, data).as_bytes()
+        except zstandard.ZstdError as e:
+            print(f"⚠️ zstd dictionary training failed ({e}); using a raw content dictionary")
+    if trained is None:
+        # A raw content dictionary: the newest payloads, most recent last
+        trained = b"".join(data)[-DICT_SIZE:]
+    dict_id = digest_of(trained)[:16]
+    write_file(os.path.join(DICT_DIR, dict_id + ".dict"), trained)
+    write_file(os.path.join(DICT_DIR, "current"), dict_id.encode())
+    _dictionaries[dict_id] = trained
+    _current[:] = [dict_id]
+    return dict_id
+
+
+def ensure_dictionary():
+    # Trains the first dictionary once enough blobs are stored
+    if BLOBS_ENABLED and current_dictionary() is None:
+        dict_id = train()
+        if dict_id:
+            print(f"✅ Trained blob compression dictionary {dict_id}")
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    if command == "train":
+        dict_id = train()
+        if dict_id is None:
+            print(f"⚠️ Need at least {DICT_MIN_SAMPLES} blobs to train a dictionary")
+            sys.exit(1)
+        print(f"✅ Trained dictionary {dict_id}; new blobs are compressed with it")
+    elif command == "cat" and len(args) == 1:
+        sys.stdout.buffer.write(get(args[0]))
+    elif command == "stats":
+        paths = list(blob_paths())
+        print(f"{len(paths)} blobs, {sum(os.path.getsize(path) for path in paths)} bytes on disk in {BLOB_DIR}")
+        print("Current dictionary:", current_dictionary() or "none")
+    else:
+        print("Usage: python -m common.blobs train")
+        print("       python -m common.blobs cat <hash>")
+        print("       python -m common.blobs stats")
+        sys.exit(2)
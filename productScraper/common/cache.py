@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# === Persistent response cache ===
+# Bodies are kept with their ETag / Last-Modified so the next run can send a
+# conditional request and reuse the stored body on 304 Not Modified.
+CACHE_ENABLED = os.environ.get("SCRAPER_CACHE", "1") == "1"
+OFFLINE = os.environ.get("SCRAPER_OFFLINE", "0") == "1"
+CACHE_TTL = float(os.environ.get("SCRAPER_CACHE_TTL_DAYS", "30")) * 86400
+CACHE_MAX_BYTES = int(float(os.environ.get("SCRAPER_CACHE_MAX_MB", "500")) * 1024 * 1024)
+
+# Entries younger than this are served without revalidating (0 = always revalidate)
+FRESH_SECONDS = float(os.environ.get("SCRAPER_CACHE_FRESH_SECONDS", "0"))
+
+# Run eviction after this many new bodies are stored
+EVICT_EVERY = 200
+
+
+def canonical_url(url):
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and not (scheme == "http" and parsed.port == 80 or scheme == "https" and parsed.port == 443):
+        host += f":{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parsed.path or "/", "", query, ""))
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, offline=OFFLINE, fresh_seconds=FRESH_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.fresh_seconds = fresh_seconds
+        self.lock = threading.Lock()
+        self.stored_since_evict = 0
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.evict()
+
+    def lookup(self, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, content_type, etag, last_modified, body, fetched_at FROM responses WHERE url = ?",
+                (canonical_url(url),)
+            ).fetchone()
+        if row is None:
+            return None
+        status, content_type, etag, last_modified, body, fetched_at = row
+        return {
+            "status": status,
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+            "fetched_at": fetched_at
+        }
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.fresh_seconds
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        body = response.content
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    canonical_url(url),
+                    response.status_code,
+                    response.headers.get("Content-Type"),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    body,
+                    len(body),
+                    now,
+                    now
+                )
+            )
+            self.stored_since_evict += 1
+            evict_now = self.stored_since_evict >= EVICT_EVERY
+        if evict_now:
+            self.evict()
+
+    def touch(self, url, response=None):
+        # A 304 confirms the stored body; refresh its timestamps (and validators)
+        now = time.time()
+        key = canonical_url(url)
+        with self.lock:
+            self.db.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, key))
+            if response is not None and response.headers.get("ETag"):
+                self.db.execute("UPDATE responses SET etag = ? WHERE url = ?", (response.headers["ETag"], key))
+
+    def mark_used(self, url):
+        with self.lock:
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), canonical_url(url)))
+
+    def evict(self):
+        with self.lock:
+            self.stored_since_evict = 0
+            if not self.offline:
+                self.db.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # Drop least recently used bodies until the cache is back under its size budget
+            excess = total - self.max_bytes
+            freed = 0
+            doomed = []
+            for url, size in self.db.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+                doomed.append((url,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.db.executemany("DELETE FROM responses WHERE url = ?", doomed)
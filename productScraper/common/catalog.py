@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+from common import fetch
+
+# === Catalog mode ===
+# Pull a Shopify storefront's whole catalog from /products.json (250 products per
+# page) the first time one of its products is requested, then answer every
+# <product-url>.json request for that store from the in-memory handle index.
+CATALOG_MODE = os.environ.get("SCRAPER_CATALOG", "1") == "1"
+PAGE_SIZE = 250
+MAX_PAGES = 200
+
+_catalogs = {}
+_store_locks = {}
+_catalog_lock = threading.Lock()
+
+
+def store_url(url):
+    parsed = urlparse(url)
+    return parsed.scheme + "://" + parsed.netloc
+
+
+def product_handle(url):
+    # Handle of a /products/<handle>.json URL, or None for anything else
+    parsed = urlparse(url)
+    if parsed.query or not parsed.path.endswith(".json"):
+        return None
+    path_parts = parsed.path[:-len(".json")].strip("/").split("/")
+    if len(path_parts) < 2 or path_parts[-2] != "products":
+        return None
+    return path_parts[-1]
+
+
+def fetch_catalog(base_url):
+    products = []
+    for page in range(1, MAX_PAGES + 1):
+        page_url = f"{base_url}/products.json?limit={PAGE_SIZE}&page={page}"
+        response = fetch.request(page_url)
+        if response.status_code != 200:
+            print(f"⚠️ Catalog page {page} for {base_url} returned {response.status_code}")
+            return None if page == 1 else products
+        page_products = fetch.json_body(response).get("products", [])
+        products.extend(page_products)
+        if len(page_products) < PAGE_SIZE:
+            break
+    return products
+
+
+def load_catalog(base_url):
+    # Index of handle -> product for a store, or None if the store has no catalog feed
+    with _catalog_lock:
+        store_lock = _store_locks.setdefault(base_url, threading.Lock())
+    with store_lock:
+        if base_url not in _catalogs:
+            try:
+                products = fetch_catalog(base_url)
+            except Exception as e:
+                print(f"⚠️ Could not load catalog for {base_url}: {e}")
+                products = None
+            if products is None:
+                _catalogs[base_url] = None
+            else:
+                _catalogs[base_url] = {product["handle"]: product for product in products}
+                print(f"Loaded {len(products)} products from {base_url}/products.json")
+        return _catalogs[base_url]
+
+
+def lookup(url):
+    handle = product_handle(url)
+    if handle is None:
+        return None
+    index = load_catalog(store_url(url))
+    if not index:
+        return None
+    return index.get(handle)
+
+
+def respond(url):
+    # fetch responder: a product missing from the catalog (unpublished, renamed
+    # handle, ...) returns None and falls through to the per-product request
+    product = lookup(url)
+    if product is None:
+        return None
+    body = json.dumps({"product": product}).encode("utf-8")
+    return fetch.make_response(url, body, headers={"Content-Type": "application/json; charset=utf-8"})
+
+
+def enable():
+    if CATALOG_MODE:
+        fetch.add_responder(respond)
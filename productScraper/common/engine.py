@@ -0,0 +1,82 @@
+import asyncio
+import os
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from common import fetch
+
+# === Concurrency limits (override with env vars) ===
+PER_HOST_LIMIT = int(os.environ.get("SCRAPER_PER_HOST", "4"))
+TOTAL_LIMIT = int(os.environ.get("SCRAPER_TOTAL", "16"))
+
+# How many input rows may be fetched ahead of the row being processed
+LOOKAHEAD_ROWS = int(os.environ.get("SCRAPER_LOOKAHEAD", "64"))
+
+
+class FetchEngine:
+    # Runs an asyncio loop in a background thread. Each request waits for a slot on
+    # its own host first, then for one of the global slots, and runs the blocking
+    # fetch.request() on a worker thread so the pooled session is shared.
+    def __init__(self, per_host=PER_HOST_LIMIT, total=TOTAL_LIMIT):
+        self.per_host = per_host
+        self.total = total
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=total)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self.total_limit = None
+        asyncio.run_coroutine_threadsafe(self._setup(), self.loop).result()
+
+    async def _setup(self):
+        self.total_limit = asyncio.Semaphore(self.total)
+
+    async def _fetch(self, url):
+        host = urlparse(url).netloc
+        async with self.host_limits[host]:
+            async with self.total_limit:
+                return await self.loop.run_in_executor(self.executor, fetch.request, url)
+
+    def submit(self, url):
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self.loop)
+
+    async def _cancel_all(self):
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.executor.shutdown(wait=False)
+        self.loop.close()
+
+
+def prefetch_rows(rows, row_urls, per_host=PER_HOST_LIMIT, total=TOTAL_LIMIT, lookahead=LOOKAHEAD_ROWS):
+    # Yield input rows in order while the URLs of upcoming rows are already being
+    # fetched. fetch.get() picks up the in-flight response instead of re-requesting.
+    engine = FetchEngine(per_host, total)
+    window = deque()
+    submitted = set()
+    try:
+        for row in rows:
+            window.append(row)
+            try:
+                urls = row_urls(row)
+            except Exception as e:
+                print(f"Could not prefetch row {row}: {e}")
+                urls = []
+            for url in urls:
+                fetch.add_pending(url, engine.submit)
+                submitted.add(url)
+            if len(window) > lookahead:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+    finally:
+        fetch.discard_pending(submitted)
+        engine.close()
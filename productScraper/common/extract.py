@@ -0,0 +1,119 @@
+import json
+import re
+
+from common import fetch
+
+# === Product data embedded in storefront pages ===
+# Shopify themes render the product object into the page (a JSON <script>, a
+# JSON-LD Product and/or a `Shopify.product = {...}` assignment), so the fields we
+# otherwise read from <url>.json can come from the HTML response we already have.
+# These are found by scanning the raw bytes for the script or assignment and
+# decoding the one JSON value that starts there; no DOM is built.
+
+# Elements product_sku() falls back to, for parsers.page(response, only=...)
+PRODUCT_DATA_TARGETS = ["meta[itemprop=sku]"]
+
+SCRIPT_TAG_RE = re.compile(rb"<script\b([^>]*)>", re.IGNORECASE)
+SCRIPT_END_RE = re.compile(rb"</script", re.IGNORECASE)
+TYPE_ATTR_RE = re.compile(rb"""(?:^|\s)type\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+
+_decoder = json.JSONDecoder()
+_assignment_res = {}
+
+
+def json_at(response, start):
+    # The JSON value starting at byte offset `start` (leading whitespace allowed),
+    # or None. A value inside a <script> cannot run past its "</script", so only
+    # that much is decoded.
+    content = response.content
+    end = SCRIPT_END_RE.search(content, start)
+    chunk = content[start:end.start() if end else len(content)]
+    try:
+        text = chunk.decode(fetch.html_encoding(response), errors="replace")
+        return _decoder.raw_decode(text.lstrip())[0]
+    except (ValueError, LookupError):
+        return None
+
+
+def script_json(response, script_type):
+    # Decoded contents of each <script type="script_type"> in the page, in order
+    wanted = script_type.encode("ascii")
+    for match in SCRIPT_TAG_RE.finditer(response.content):
+        type_match = TYPE_ATTR_RE.search(match.group(1))
+        if type_match and next(g for g in type_match.groups() if g is not None) == wanted:
+            data = json_at(response, match.end())
+            if data is not None:
+                yield data
+
+
+def assigned_json(response, target):
+    # The JSON value a page script assigns to `target`, e.g. "Shopify.product"
+    pattern = _assignment_res.get(target)
+    if pattern is None:
+        pattern = re.compile(rb"(?<![\w$.])" + re.escape(target.encode("ascii")) + rb"\s*=(?!=)\s*")
+        _assignment_res[target] = pattern
+    for match in pattern.finditer(response.content):
+        data = json_at(response, match.end())
+        if data is not None:
+            return data
+    return None
+
+
+def normalize_product(product):
+    # Shape an embedded product like the <url>.json "product": body_html instead of
+    # description, and variant prices as "12.00" strings instead of integer cents
+    variants = []
+    for variant in product.get("variants", []):
+        variant = dict(variant)
+        price = variant.get("price")
+        if isinstance(price, int):
+            variant["price"] = f"{price / 100:.2f}"
+        elif price is not None:
+            variant["price"] = str(price)
+        variants.append(variant)
+    normalized = dict(product)
+    normalized["body_html"] = product.get("body_html", product.get("description", "")) or ""
+    normalized["variants"] = variants
+    return normalized
+
+
+def product_json(response):
+    # The page's embedded product object in <url>.json shape, or None
+    for data in script_json(response, "application/json"):
+        if isinstance(data, dict) and isinstance(data.get("product"), dict):
+            data = data["product"]
+        if isinstance(data, dict) and data.get("variants") and "title" in data:
+            return normalize_product(data)
+    return None
+
+
+def json_ld_product(response):
+    # First schema.org Product in the page's JSON-LD, or None
+    for data in script_json(response, "application/ld+json"):
+        candidates = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in candidates:
+            if isinstance(item, dict) and item.get("@type") in ("Product", ["Product"]):
+                return item
+    return None
+
+
+def product_sku(response, soup):
+    # SKU of the page's first variant, from the embedded product JSON, JSON-LD or
+    # microdata; `soup` only needs the PRODUCT_DATA_TARGETS elements
+    product = product_json(response)
+    if product and product["variants"][0].get("sku"):
+        return product["variants"][0]["sku"]
+
+    ld_product = json_ld_product(response)
+    if ld_product:
+        offers = ld_product.get("offers")
+        if isinstance(offers, list):
+            offers = offers[0] if offers else {}
+        sku = ld_product.get("sku") or (offers or {}).get("sku")
+        if sku:
+            return str(sku)
+
+    sku_tag = soup.find("meta", itemprop="sku")
+    if sku_tag and sku_tag.get("content"):
+        return sku_tag["content"]
+    return None
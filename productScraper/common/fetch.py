@@ -0,0 +1,259 @@
+import json
+import os
+import re
+import threading
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from common import cache, fixtures, ratelimit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# === Shared request settings ===
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/html;q=0.9, */*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+}
+
+DEFAULT_TIMEOUT = 30
+
+# Bytes of an HTML page searched for a <meta charset> when the header has none
+META_CHARSET_WINDOW = 2048
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+# Where snapshots, the response cache and other run data are kept
+DATA_DIR = os.environ.get("SCRAPER_DATA_DIR", os.path.join(os.path.expanduser("~"), ".regimenpro_scraper"))
+
+# Number of hosts to keep pools for, and keep-alive connections per host
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+_fixtures = None
+_fixtures_lock = threading.Lock()
+
+# Functions that can answer a URL without the network (e.g. common.catalog).
+# Each takes the URL and returns a response or None.
+_responders = []
+
+# Responses already in flight from common.engine, keyed by URL: [future, uses left]
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def build_session():
+    # Kept-alive connections are pooled per host, so concurrent requests to a
+    # brand reuse open connections instead of reconnecting each time
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if cache.CACHE_ENABLED or cache.OFFLINE:
+                    _cache = cache.ResponseCache(os.path.join(DATA_DIR, "http_cache.sqlite3"))
+                else:
+                    _cache = False
+    return _cache or None
+
+
+def get_fixtures():
+    # (recorder, replayer) configured by SCRAPER_RECORD / SCRAPER_REPLAY
+    global _fixtures
+    if _fixtures is None:
+        with _fixtures_lock:
+            if _fixtures is None:
+                _fixtures = (fixtures.recorder_from_env(), fixtures.replayer_from_env())
+    return _fixtures
+
+
+def use_fixtures(recorder=None, replayer=None):
+    # Overrides SCRAPER_RECORD / SCRAPER_REPLAY for this process
+    global _fixtures
+    with _fixtures_lock:
+        _fixtures = (recorder, replayer)
+
+
+def add_responder(responder, first=False):
+    if responder in _responders:
+        return
+    if first:
+        _responders.insert(0, responder)
+    else:
+        _responders.append(responder)
+
+
+def make_response(url, content, status_code=200, headers=None):
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = HTTPStatus(status_code).phrase
+    response.headers.update(headers or {})
+    response._content = content
+    return response
+
+
+def add_pending(url, submit):
+    # Counts one more use of url's in-flight response, calling submit(url) for
+    # the future only when url is not already pending, so rows sharing a URL
+    # send one request
+    with _pending_lock:
+        if url in _pending:
+            _pending[url][1] += 1
+        else:
+            _pending[url] = [submit(url), 1]
+
+
+def _take_pending(url):
+    with _pending_lock:
+        entry = _pending.get(url)
+        if entry is None:
+            return None
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _pending[url]
+        return entry[0]
+
+
+def discard_pending(urls):
+    with _pending_lock:
+        for url in urls:
+            _pending.pop(url, None)
+
+
+def request(url, **kwargs):
+    recorder, replayer = get_fixtures()
+    if replayer is not None:
+        return replayed_response(replayer, url)
+    response = fetch_response(url, **kwargs)
+    if recorder is not None:
+        recorder.record(url, response)
+    return response
+
+
+def replayed_response(replayer, url):
+    entry = replayer.lookup(url)
+    if entry is None:
+        print(f"⚠️ Replay: {url} was not recorded")
+        return make_response(url, b"", 404, {"X-Scraper-Replay": "miss"})
+    return make_response(url, entry["body"], entry["status"], entry["headers"])
+
+
+def fetch_response(url, **kwargs):
+    for responder in _responders:
+        response = responder(url)
+        if response is not None:
+            return response
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    response_cache = get_cache()
+    if response_cache is None:
+        return send(url, **kwargs)
+    return cached_request(response_cache, url, **kwargs)
+
+
+def send(url, **kwargs):
+    return ratelimit.send(url, lambda: get_session().get(url, **kwargs))
+
+
+def cached_response(url, entry, cache_status):
+    headers = {"X-Scraper-Cache": cache_status}
+    for header, key in (("Content-Type", "content_type"), ("ETag", "etag"), ("Last-Modified", "last_modified")):
+        if entry.get(key):
+            headers[header] = entry[key]
+    return make_response(url, entry["body"], entry["status"], headers)
+
+
+def cached_request(response_cache, url, **kwargs):
+    entry = response_cache.lookup(url)
+    if entry is not None and (response_cache.offline or response_cache.is_fresh(entry)):
+        response_cache.mark_used(url)
+        return cached_response(url, entry, "hit")
+    if response_cache.offline:
+        print(f"⚠️ Offline mode: {url} is not in the cache")
+        return make_response(url, b"", 504, {"X-Scraper-Cache": "miss"})
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(response_cache.conditional_headers(entry))
+    response = send(url, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        response_cache.touch(url, response)
+        return cached_response(url, entry, "revalidated")
+    if response.status_code == 200:
+        response_cache.store(url, response)
+    return response
+
+
+# === Response bodies ===
+# Work from response.content so requests never runs charset detection over a
+# whole page: JSON goes to the decoder as bytes, HTML goes to the parser as
+# bytes with the encoding the server (or the page's <meta>) declared.
+def declared_encoding(response):
+    content_type = response.headers.get("Content-Type", "")
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value.strip():
+            return value.strip().strip('"\'')
+    return None
+
+
+def html_encoding(response):
+    encoding = declared_encoding(response)
+    if encoding:
+        return encoding
+    match = META_CHARSET_RE.search(response.content[:META_CHARSET_WINDOW])
+    if match:
+        return match.group(1).decode("ascii")
+    return "utf-8"
+
+
+def json_body(response):
+    content = response.content
+    encoding = declared_encoding(response)
+    if encoding and encoding.lower().replace("-", "") not in ("utf8", "ascii", "usascii"):
+        content = content.decode(encoding).encode("utf-8")
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def get(url, **kwargs):
+    # Use the prefetched response when the engine already requested this URL.
+    # The engine sends no request options, so a call passing any (timeout=,
+    # headers=, ...) makes its own request
+    future = _take_pending(url) if not kwargs else None
+    if future is not None:
+        return future.result()
+    return request(url, **kwargs)
@@ -0,0 +1,86 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+import zipfile
+
+from common.cache import canonical_url
+
+# === Record / replay ===
+# SCRAPER_RECORD=<file.zip> saves every response a scraper receives into a
+# compressed archive; SCRAPER_REPLAY=<file.zip> serves those exact bytes back
+# with no network, so a run can be repeated offline and deterministically.
+RECORD_PATH = os.environ.get("SCRAPER_RECORD", "")
+REPLAY_PATH = os.environ.get("SCRAPER_REPLAY", "")
+
+# Only headers the scrapers (or the parsers behind them) can observe
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def entry_name(url):
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.names = set()
+        self.archive = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9)
+        atexit.register(self.close)
+
+    def record(self, url, response):
+        name = entry_name(url)
+        meta = {
+            "url": url,
+            "status": response.status_code,
+            "headers": {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers}
+        }
+        with self.lock:
+            # The first answer for a URL wins, matching what replay will serve
+            if name in self.names or self.archive is None:
+                return
+            self.names.add(name)
+            self.archive.writestr(name + ".json", json.dumps(meta))
+            self.archive.writestr(name + ".body", response.content)
+
+    def close(self):
+        with self.lock:
+            if self.archive is not None:
+                self.archive.close()
+                self.archive = None
+                print(f"Recorded {len(self.names)} responses to {self.path}")
+
+
+class Replayer:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.archive = zipfile.ZipFile(path, "r")
+        self.names = set(self.archive.namelist())
+
+    def lookup(self, url):
+        # Recorded {"url", "status", "headers", "body"} for a URL, or None
+        name = entry_name(url)
+        if name + ".json" not in self.names:
+            return None
+        with self.lock:
+            meta = json.loads(self.archive.read(name + ".json"))
+            meta["body"] = self.archive.read(name + ".body")
+        return meta
+
+    def urls(self):
+        with self.lock:
+            return [
+                json.loads(self.archive.read(name))["url"]
+                for name in sorted(self.names) if name.endswith(".json")
+            ]
+
+
+def recorder_from_env():
+    return Recorder(RECORD_PATH) if RECORD_PATH else None
+
+
+def replayer_from_env():
+    return Replayer(REPLAY_PATH) if REPLAY_PATH else None
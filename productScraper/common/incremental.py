@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import re
+
+from common import extract, parsers
+
+# === Incremental runs ===
+# Each product's fetched inputs (both sides' product JSON, wanted variant and
+# what their rules read from pages) are hashed after normalizing, together with
+# the brand's spec and the shared code that reads it. The hash is taken in the
+# parse worker (Plan.parse), not on the fetch thread. A product whose hash
+# matches one in the brand's latest complete run reuses that stored result
+# instead of having its fields read and compared again, so a daily sweep spends
+# its parse and compare time on what changed. Of a page only the elements the
+# side's rules target (Side.page_reads) and the product data embedded rules find
+# are hashed. The targeted elements come from the partial parse the side's
+# fields are then read from, so a changed page is parsed once. Nonces, CSRF
+# tokens, cache-busting URLs and timestamps elsewhere in the markup don't defeat
+# reuse. A side with a rule that reads the whole page (a "text" rule, or an
+# "after" rule without "next", "in" the page) hashes the whole body, and any
+# such token in it makes the product count as changed every run.
+# Set SCRAPER_INCREMENTAL=0 to re-evaluate every product.
+ENABLED = os.environ.get("SCRAPER_INCREMENTAL", "1") != "0"
+
+WHITESPACE_RE = re.compile(rb"\s+")
+COMMON_DIR = os.path.dirname(os.path.abspath(__file__))
+# selectolax always builds the whole page, so under it the targeted elements
+# are hashed from a BeautifulSoup partial parse of their own
+HASH_BACKEND = "lxml" if "lxml" in parsers.available_backends() else "html.parser"
+
+
+def code_version():
+    # Hash of the shared modules, so changing how fields are read or compared
+    # invalidates every stored input hash
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(COMMON_DIR)):
+        if name.endswith(".py"):
+            with open(os.path.join(COMMON_DIR, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+
+def plan_version(spec):
+    digest = hashlib.sha256(CODE_VERSION.encode())
+    digest.update(json.dumps(spec, sort_keys=True, default=repr).encode())
+    return digest.hexdigest()
+
+
+def json_bytes(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def targeted_markup(ctx):
+    # The side's targeted page elements, as built by parsers.PageTargets
+    if parsers.resolve(ctx.backend) == "selectolax":
+        return str(parsers.page(ctx.response, only=ctx.side.page_reads, backend=HASH_BACKEND))
+    return str(ctx.page())
+
+
+def page_inputs(ctx):
+    # What the side's rules can read from the context's fetched page
+    side, response = ctx.side, ctx.response
+    if side.page_reads is None:
+        # Markup reflowed without changing its content hashes the same
+        return WHITESPACE_RE.sub(b" ", response.content).strip()
+    parts = []
+    if side.page_reads:
+        parts.append(targeted_markup(ctx).encode())
+    if side.reads_embedded:
+        parts.append(json_bytes([extract.product_json(response), extract.json_ld_product(response)]))
+    return b"\0".join(parts)
+
+
+def update_doc(digest, ctx):
+    doc = ctx.doc
+    digest.update(json.dumps(doc.get("variant", ""), ensure_ascii=False).encode())
+    digest.update(b"\0")
+    digest.update(json_bytes(doc.get("product")))
+    digest.update(b"\0")
+    response = doc.get("response")
+    if response is not None:
+        digest.update(page_inputs(ctx))
+    digest.update(b"\1")
+
+
+def input_hash(version, urls, contexts):
+    # Hex digest of one product's inputs, read through each side's Context
+    # (common.specs), or None when a side failed to fetch (those are always
+    # re-evaluated)
+    if any("error" in ctx.doc for ctx in contexts):
+        return None
+    digest = hashlib.sha256(version.encode())
+    for url in urls:
+        digest.update(url.encode() + b"\0")
+    for ctx in contexts:
+        update_doc(digest, ctx)
+    return digest.hexdigest()
+
+
+CODE_VERSION = code_version()
@@ -0,0 +1,93 @@
+import os
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+
+# === Text normalization ===
+# The forms values are compared in. Each is built from precompiled str.translate
+# tables and memoized by input string, so the same name, size or "N/A" showing
+# up across thousands of compared fields is normalized once per process.
+MEMO_SIZE = int(os.environ.get("SCRAPER_NORMALIZE_MEMO", "65536"))
+
+LINE_BREAKS = str.maketrans("", "", "\n\r")
+COMMAS = str.maketrans("", "", ",")
+WHITESPACE = str.maketrans("", "", " \t\n\r\f\v\u00a0")
+# List items end at a comma, semicolon, bullet or line break; commas inside
+# parentheses ("Tocopherol (Vitamin E, Natural)") belong to the item
+LIST_SEPARATOR_RE = re.compile(r"[;•\n\r]|,(?![^()]*\))")
+TOKEN_EDGES = " \t.*:-–—"
+# Spellings of the same unit, applied once whitespace is gone
+UNIT_SPELLINGS = [("fl.oz", "oz"), ("floz", "oz"), ("ounces", "oz"), ("ounce", "oz"), ("milliliters", "ml")]
+
+
+@lru_cache(maxsize=None)
+def removal_table(chars):
+    # str.translate table deleting every character in chars
+    return str.maketrans("", "", chars)
+
+
+def strip(s):
+    return s.strip()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def casefold(s):
+    return s.strip().lower()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def normalize_text(s):
+    # Stripped, lowercase and without line breaks; "N/A" for an empty value
+    return s.strip().lower().translate(LINE_BREAKS) if s else "N/A"
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def words(s):
+    # Lowercase words without commas, single-spaced
+    return ' '.join(s.lower().translate(COMMAS).split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def nfkd(s):
+    # Compatibility-decomposed and single-spaced; ASCII is already NFKD.
+    # Preserves leading zeros, unlike a numeric normalization
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s)
+    return ' '.join(s.split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def size(s):
+    # A variant size or option value without case, spacing or unit spelling
+    # differences: "1.7 Fl. Oz" and "1.7oz" are both "1.7oz"
+    s = nfkd(s).lower().translate(WHITESPACE)
+    for spelling, unit in UNIT_SPELLINGS:
+        s = s.replace(spelling, unit)
+    return s
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def cents(s, ignore="$"):
+    # The price in integer cents once the ignore characters are removed, or
+    # None when it is not a number
+    try:
+        return round(float(s.translate(removal_table(ignore)).strip()) * 100)
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def tokens(s):
+    # The items of an ingredient or benefit list as canonical tokens (NFKD,
+    # lowercase, single-spaced, without edge punctuation), in order and without
+    # repeats. Tokens are interned, so equal ones are one shared string and set
+    # operations on them compare by identity first.
+    if not s.isascii():
+        s = unicodedata.normalize("NFKD", s)
+    found = {}
+    for item in LIST_SEPARATOR_RE.split(s.lower()):
+        token = ' '.join(item.strip(TOKEN_EDGES).split())
+        if token:
+            found.setdefault(sys.intern(token), None)
+    return tuple(found)
@@ -0,0 +1,58 @@
+import csv
+import os
+
+# === Streaming CSV output ===
+# Rows go to "<path>.partial" as a run produces them, written and flushed to
+# disk every WRITE_BATCH rows, and the finished file is renamed over <path> in
+# one step. An earlier output is never left half-written, and a run that crashes
+# or is interrupted keeps the rows it finished in the .partial file.
+WRITE_BATCH = int(os.environ.get("SCRAPER_WRITE_BATCH", "200"))
+
+
+class CsvOutput:
+    def __init__(self, path, fieldnames, batch_size=WRITE_BATCH):
+        self.path = path
+        self.partial_path = path + ".partial"
+        self.batch_size = max(batch_size, 1)
+        self.pending = []
+        self.file = open(self.partial_path, "w", newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def writerows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        self.writer.writerows(self.pending)
+        self.pending.clear()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def commit(self):
+        self.flush()
+        self.file.close()
+        os.replace(self.partial_path, self.path)
+
+    def abandon(self):
+        # Keeps the rows written so far in the .partial file
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+        print(f"⚠️ Run stopped early; rows written so far are in {self.partial_path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abandon()
+        return False
@@ -0,0 +1,111 @@
+import importlib.util
+import json
+import os
+import sys
+
+from common import fetch, fixtures, parsers
+
+# === Parser backend parity check ===
+# Reads recorded documents through brand plans -- the same compiled field rules
+# a run uses -- with each installed parser backend, and (BeautifulSoup backends)
+# both fully and restricted to the side's page targets, and reports any field
+# that differs from a full html.parser parse. Expect differences only on markup
+# with unclosed <p>/<li>/<dd> tags, which html.parser nests inside each other
+# and lxml/selectolax close as browsers do. Record an archive with
+# SCRAPER_RECORD=<file.zip>, then check it against the brand scripts it covers:
+#   cd productScraper && python -m common.parity recorded.zip AO2_Clear/AO2_Clear.py ...
+# tests/test_parity.py runs the same check on the pages in tests/fixtures/parity.
+REFERENCE = "html.parser"
+
+
+def brand_plan(script):
+    # PLAN of a brand script, imported without running it
+    name = "brand_" + os.path.splitext(os.path.basename(script))[0]
+    module_spec = importlib.util.spec_from_file_location(name, script)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module.PLAN
+
+
+def parses(side, backends):
+    # (name, backend, partial) of every way a run could parse the side
+    ways = [(backend, backend, False) for backend in backends]
+    if side.page_targets is not None:
+        ways += [(f"{backend} (partial)", backend, True) for backend in backends if backend != "selectolax"]
+    return ways
+
+
+def side_values(side, doc, backend, partial):
+    ctx = side.read(doc, backend=backend, partial=partial)
+    return {**ctx.values, "(notes)": ctx.notes}
+
+
+def compare(side, doc, backends=None):
+    # [(parse, column, reference value, value)] for each field a parse reads
+    # differently from a full REFERENCE parse
+    backends = backends or parsers.available_backends()
+    reference = side_values(side, doc, REFERENCE, False)
+    differences = []
+    for name, backend, partial in parses(side, backends):
+        if backend == REFERENCE and not partial:
+            continue
+        for column, value in side_values(side, doc, backend, partial).items():
+            if value != reference[column]:
+                differences.append((name, column, reference[column], value))
+    return differences
+
+
+def recorded_products(response):
+    try:
+        data = fetch.json_body(response)
+    except ValueError:
+        return []
+    if not isinstance(data, dict):
+        return []
+    if isinstance(data.get("product"), dict):
+        return [data["product"]]
+    return [product for product in data.get("products") or [] if isinstance(product, dict)]
+
+
+def recorded_docs(plan, replayer):
+    # (url, side, doc) for each recorded page or product JSON a side of the plan reads
+    for url in replayer.urls():
+        entry = replayer.lookup(url)
+        if entry["status"] != 200:
+            continue
+        response = fetch.make_response(url, entry["body"], entry["status"], entry["headers"])
+        content_type = response.headers.get("Content-Type", "")
+        for side in (plan.brand_side, plan.regimen_side):
+            if side.type == "page" and "html" in content_type:
+                yield url, side, side.page_doc(url, response, {"variant": ""})
+            elif side.type == "shopify" and "json" in content_type:
+                for product in recorded_products(response):
+                    yield f"{url}#{product.get('handle', '')}", side, {"variant": "", "product": product}
+
+
+def check(path, scripts, backends=None):
+    backends = backends or parsers.available_backends()
+    replayer = fixtures.Replayer(path)
+    # Anything a page needs beyond itself (e.g. <url>.json) comes from the archive too
+    fetch.use_fixtures(None, replayer)
+    checked = 0
+    mismatches = 0
+    for script in scripts:
+        plan = brand_plan(script)
+        for url, side, doc in recorded_docs(plan, replayer):
+            checked += 1
+            for name, column, expected, value in compare(side, doc, backends):
+                mismatches += 1
+                print(f"❌ {plan.brand} {side.name}: {name} differs on '{column}' for {url}")
+                print(f"   {REFERENCE}: {json.dumps(expected, default=str)[:300]}")
+                print(f"   {name}: {json.dumps(value, default=str)[:300]}")
+
+    print(f"Checked {checked} documents with {', '.join(backends)}: {mismatches} mismatched fields")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m common.parity <recorded.zip> <brand script> [brand script ...]")
+        sys.exit(2)
+    sys.exit(0 if check(sys.argv[1], sys.argv[2:]) else 1)
@@ -0,0 +1,188 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+from common import normalize, store
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# === Parquet export ===
+# Writes runs from the results store (common.store) as typed, compressed
+# Parquet for analytics, one file per run in each of three datasets:
+#   <dir>/products/brand=<brand>/run_date=<YYYY-MM-DD>/run-<id>.parquet
+#   <dir>/variants/...   <dir>/comparisons/...
+# Prices are integer cents, capture times are timestamps, and brands, fields,
+# sides and match texts/statuses are dictionary-encoded. Load with e.g.
+#   pyarrow.dataset.dataset("<dir>/comparisons", partitioning="hive")
+# Set SCRAPER_PARQUET_DIR to export each completed run, or export stored runs
+# (every completed run when none are given):
+#   cd productScraper && python -m common.parquet <dir> [run id ...]
+PARQUET_DIR = os.environ.get("SCRAPER_PARQUET_DIR", "")
+ROWS_PER_BATCH = 10000
+# The scraped column holding the product price in every spec
+PRICE_COLUMN = "Product Price"
+PRICE_IGNORE = "$,"
+
+
+def timestamp(value):
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S") if value else None
+
+
+def cents(value):
+    return normalize.cents(value, PRICE_IGNORE) if isinstance(value, str) else None
+
+
+def category():
+    return pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+
+
+def product_schema(fields):
+    columns = [
+        ("run_id", pyarrow.int64()),
+        ("url", pyarrow.string()),
+        ("handle", pyarrow.string()),
+        ("regimen_url", pyarrow.string()),
+        ("regimen_handle", pyarrow.string()),
+        ("admin_url", pyarrow.string()),
+        ("captured_at", pyarrow.timestamp("s")),
+        ("price_cents", pyarrow.int64()),
+        ("regimen_price_cents", pyarrow.int64()),
+        ("reused_from", pyarrow.int64()),
+    ]
+    columns += [(field, pyarrow.string()) for field in fields]
+    columns += [(f"RegimenPro {field}", pyarrow.string()) for field in fields]
+    return pyarrow.schema(columns)
+
+
+def product_rows(db, run_id, fields):
+    for run, url, handle, regimen_url, regimen_handle, admin_url, captured_at, brand_values, regimen_values, reused_from in db.execute(
+        "SELECT run_id, url, handle, regimen_url, regimen_handle, admin_url, captured_at, brand_values, regimen_values,"
+        " reused_from FROM products WHERE run_id = ? ORDER BY id", (run_id,)
+    ):
+        brand_values, regimen_values = json.loads(brand_values), json.loads(regimen_values)
+        row = {
+            "run_id": run, "url": url, "handle": handle, "regimen_url": regimen_url,
+            "regimen_handle": regimen_handle, "admin_url": admin_url, "captured_at": timestamp(captured_at),
+            "price_cents": cents(brand_values.get(PRICE_COLUMN)),
+            "regimen_price_cents": cents(regimen_values.get(PRICE_COLUMN)),
+            "reused_from": reused_from,
+        }
+        for field in fields:
+            row[field] = brand_values.get(field)
+            row[f"RegimenPro {field}"] = regimen_values.get(field)
+        yield row
+
+
+def variant_schema():
+    return pyarrow.schema([
+        ("run_id", pyarrow.int64()),
+        ("url", pyarrow.string()),
+        ("side", category()),
+        ("position", pyarrow.int32()),
+        ("variant_id", pyarrow.string()),
+        ("title", pyarrow.string()),
+        ("sku", pyarrow.string()),
+        ("barcode", pyarrow.string()),
+        ("price_cents", pyarrow.int64()),
+        ("captured_at", pyarrow.timestamp("s")),
+    ])
+
+
+def variant_rows(db, run_id):
+    for run, url, side, position, variant_id, title, sku, barcode, price, captured_at in db.execute(
+        "SELECT variants.run_id, products.url, side, position, variant_id, title, sku, barcode, price, captured_at"
+        " FROM variants JOIN products ON products.id = variants.product_id"
+        " WHERE variants.run_id = ? ORDER BY variants.id", (run_id,)
+    ):
+        yield {
+            "run_id": run, "url": url, "side": side, "position": position, "variant_id": variant_id,
+            "title": title, "sku": sku, "barcode": barcode, "price_cents": cents(price),
+            "captured_at": timestamp(captured_at),
+        }
+
+
+def comparison_schema():
+    return pyarrow.schema([
+        ("run_id", pyarrow.int64()),
+        ("url", pyarrow.string()),
+        ("handle", pyarrow.string()),
+        ("field", category()),
+        ("column_name", category()),
+        ("brand_value", pyarrow.string()),
+        ("regimen_value", pyarrow.string()),
+        ("match", category()),
+        ("status", category()),
+        ("captured_at", pyarrow.timestamp("s")),
+    ])
+
+
+def comparison_rows(db, run_id):
+    for run, url, handle, field, column_name, brand_value, regimen_value, match, status, captured_at in db.execute(
+        "SELECT run_id, url, handle, field, column_name, brand_value, regimen_value, match, status, captured_at"
+        " FROM comparison_rows WHERE run_id = ? ORDER BY id", (run_id,)
+    ):
+        yield {
+            "run_id": run, "url": url, "handle": handle, "field": field, "column_name": column_name,
+            "brand_value": brand_value, "regimen_value": regimen_value, "match": match, "status": status,
+            "captured_at": timestamp(captured_at),
+        }
+
+
+def write_dataset(path, schema, rows):
+    # Streams rows into path ROWS_PER_BATCH at a time, then moves the file into place
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = path + ".partial"
+    writer = pyarrow.parquet.ParquetWriter(partial_path, schema, compression="zstd")
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= ROWS_PER_BATCH:
+                writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+                batch.clear()
+        if batch:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+    finally:
+        writer.close()
+    os.replace(partial_path, path)
+
+
+def export_run(db, run_id, directory):
+    # The run's three Parquet files, or [] when pyarrow is not installed
+    if pyarrow is None:
+        print("⚠️ pyarrow is not installed; skipping the Parquet export")
+        return []
+    brand, started_at, scraped_columns = db.execute(
+        "SELECT brand, started_at, scraped_columns FROM runs WHERE id = ?", (run_id,)
+    ).fetchone()
+    fields = [column for column in json.loads(scraped_columns) if column not in ("Product URL", "Date/Time Captured")]
+    partition = os.path.join(f"brand={brand}", f"run_date={started_at[:10]}", f"run-{run_id}.parquet")
+    datasets = [
+        ("products", product_schema(fields), product_rows(db, run_id, fields)),
+        ("variants", variant_schema(), variant_rows(db, run_id)),
+        ("comparisons", comparison_schema(), comparison_rows(db, run_id)),
+    ]
+    paths = []
+    for name, schema, rows in datasets:
+        path = os.path.join(directory, name, partition)
+        write_dataset(path, schema, rows)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m common.parquet <dir> [run id ...]")
+        sys.exit(2)
+    db = store.connect()
+    run_ids = [int(run_id) for run_id in sys.argv[2:]]
+    if not run_ids:
+        run_ids = [run_id for (run_id,) in db.execute("SELECT id FROM runs WHERE status = 'complete' ORDER BY id")]
+    for run_id in run_ids:
+        for path in export_run(db, run_id, sys.argv[1]):
+            print("✅ Exported", path)
@@ -0,0 +1,435 @@
+import os
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+from common import fetch
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+try:
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# === HTML parser backends ===
+# SCRAPER_PARSER picks how pages and body_html fragments are parsed for a run:
+#   html.parser  BeautifulSoup's pure-Python parser (default)
+#   lxml         BeautifulSoup on the libxml2 tree builder
+#   selectolax   the lexbor C parser behind the BeautifulSoup-style Tag below
+# Scrapers only call page()/fragment() and the find/find_all/get_text methods the
+# backends share; common/parity.py checks them against each other on recorded pages.
+BACKENDS = ("html.parser", "lxml", "selectolax")
+PARSER = os.environ.get("SCRAPER_PARSER", "html.parser")
+
+# bs4 leaves the text of these elements out of get_text()
+HIDDEN_TEXT_TAGS = ("script", "style", "template")
+
+TEXT_NODE = "-text"
+COMMENT_NODE = "-comment"
+
+_warned = set()
+
+
+def available_backends():
+    installed = {"html.parser": True, "lxml": lxml is not None, "selectolax": LexborHTMLParser is not None}
+    return [backend for backend in BACKENDS if installed[backend]]
+
+
+def resolve(backend=None):
+    backend = backend or PARSER
+    if backend in available_backends():
+        return backend
+    if backend not in _warned:
+        _warned.add(backend)
+        print(f"⚠️ HTML parser backend '{backend}' is not available, using html.parser")
+    return "html.parser"
+
+
+def page(response, only=None, backend=None):
+    # Parsed document for a full HTML response, decoded like fetch.html_encoding().
+    # `only` lists the elements the caller reads (see PageTargets); BeautifulSoup
+    # backends then build just those subtrees instead of the whole page
+    backend = resolve(backend)
+    encoding = fetch.html_encoding(response)
+    if backend == "selectolax":
+        try:
+            markup = response.content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            markup = UnicodeDammit(response.content, [encoding]).unicode_markup or ""
+        return Tag(LexborHTMLParser(markup).root)
+    parse_only = PageTargets(only) if only and ElementFilter is not None else None
+    return BeautifulSoup(response.content, backend, from_encoding=encoding, parse_only=parse_only)
+
+
+def is_top_level(soup, tag):
+    # False when `tag` sits inside another element kept by page(..., only=...),
+    # where lookups that leave its subtree (find_next) may miss elements that
+    # were not kept; always True for fully parsed pages
+    if getattr(soup, "parse_only", None) is None:
+        return True
+    return tag.parent is soup
+
+
+def fragment(html, backend=None):
+    # Parsed body_html (or any other HTML snippet held as a string)
+    backend = resolve(backend)
+    if backend == "selectolax":
+        return Tag(LexborHTMLParser(html or "").root)
+    return BeautifulSoup(html, backend)
+
+
+# === Partial page parsing ===
+# Selectors understood by page(..., only=...):
+#   "h1"  "p.product__description"  "aside#product-ingredients"
+#   "meta[itemprop=price]"  "script[type=application/ld+json]"
+#   "h2 + div"  the first <div> starting after each top-level <h2>, for lookups
+#               like soup.find("h2", ...).find_next("div")
+# Each matching element is kept with its whole subtree, in document order, so
+# find/find_all on the kept elements behave as on the full page.
+SELECTOR_RE = re.compile(
+    r"^(?P<name>[\w-]+|\*)?"
+    r"(?:\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)=[\"']?(?P<value>[^\"'\]]*)[\"']?\])?$"
+)
+
+
+@lru_cache(maxsize=None)
+def parse_selector(selector):
+    # (tag name or None, attribute, value or None, class token or None)
+    match = SELECTOR_RE.match(selector.strip())
+    if match is None:
+        raise ValueError(f"Unsupported page selector: {selector!r}")
+    name = match.group("name")
+    if name == "*":
+        name = None
+    if match.group("cls"):
+        return name, "class", None, match.group("cls")
+    if match.group("id"):
+        return name, "id", match.group("id"), None
+    return name, match.group("attr"), match.group("value"), None
+
+
+def _selector_matches(rule, name, attrs):
+    rule_name, attr, value, token = rule
+    if rule_name is not None and rule_name != name:
+        return False
+    if attr is None:
+        return True
+    actual = attrs.get(attr) if attrs else None
+    if isinstance(actual, (list, tuple)):
+        actual = " ".join(actual)
+    if actual is None:
+        return False
+    if token is not None:
+        return token in actual.split()
+    return actual == value
+
+
+if ElementFilter is not None:
+    class PageTargets(ElementFilter):
+        # BeautifulSoup asks this about every tag outside an already kept subtree
+        def __init__(self, selectors):
+            super().__init__()
+            self.rules = []
+            self.followers = []
+            for selector in selectors:
+                if " + " in selector:
+                    first, then = (part.strip() for part in selector.split(" + ", 1))
+                    self.followers.append((parse_selector(first), parse_selector(then)))
+                else:
+                    self.rules.append(parse_selector(selector))
+            self.waiting = set()
+
+        @property
+        def includes_everything(self):
+            return False
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            keep = any(_selector_matches(rule, name, attrs) for rule in self.rules)
+            for i, (first, then) in enumerate(self.followers):
+                if i in self.waiting and _selector_matches(then, name, attrs):
+                    self.waiting.discard(i)
+                    keep = True
+                if _selector_matches(first, name, attrs):
+                    self.waiting.add(i)
+                    keep = True
+            return keep
+
+        def allow_string_creation(self, string):
+            return False
+
+
+# === BeautifulSoup-style access to a lexbor tree ===
+# Covers the calls the scrapers make: find/find_all (tag name, class_, attribute
+# and string filters), find_next, find_next_sibling, find_parent, .string,
+# .text/get_text and attribute lookup, with BeautifulSoup's matching rules.
+
+class String(str):
+    def __new__(cls, node):
+        value = node.text_content if node.tag == TEXT_NODE else node.comment_content
+        string = super().__new__(cls, value or "")
+        string.node = node
+        return string
+
+    @property
+    def parent(self):
+        return Tag(self.node.parent) if self.node.parent is not None else None
+
+    def find_parent(self, name=None, attrs=None, **kwargs):
+        return _first(_tag_matcher(name, attrs, None, kwargs), _ancestors(self.node))
+
+    def find_next(self, name=None, attrs=None, string=None, **kwargs):
+        return _first(_matcher(name, attrs, string, kwargs), _following(self.node))
+
+
+class Tag:
+    def __init__(self, node):
+        self.node = node
+
+    def __repr__(self):
+        return self.node.html or ""
+
+    def __eq__(self, other):
+        return isinstance(other, Tag) and self.node.mem_id == other.node.mem_id
+
+    def __hash__(self):
+        return self.node.mem_id
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    @property
+    def attrs(self):
+        return {key: self.get(key) for key in self.node.attributes}
+
+    def get(self, key, default=None):
+        attributes = self.node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key] or ""
+        return value.split() if key == "class" else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def has_attr(self, key):
+        return key in self.node.attributes
+
+    @property
+    def parent(self):
+        return Tag(self.node.parent) if self.node.parent is not None else None
+
+    @property
+    def contents(self):
+        return [_wrap(child) for child in _children(self.node)]
+
+    @property
+    def string(self):
+        children = list(_children(self.node))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.tag in (TEXT_NODE, COMMENT_NODE):
+            return String(child)
+        return Tag(child).string
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def get_text(self, separator="", strip=False):
+        strings = _visible_strings(self.node)
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    def find_all(self, name=None, attrs=None, string=None, limit=None, **kwargs):
+        matches = []
+        for found in _search(self.node, name, attrs, string, kwargs):
+            matches.append(found)
+            if limit and len(matches) >= limit:
+                break
+        return matches
+
+    def find(self, name=None, attrs=None, string=None, **kwargs):
+        return next(_search(self.node, name, attrs, string, kwargs), None)
+
+    def find_next(self, name=None, attrs=None, string=None, **kwargs):
+        return _first(_matcher(name, attrs, string, kwargs), _following(self.node))
+
+    def find_next_sibling(self, name=None, attrs=None, string=None, **kwargs):
+        return _first(_matcher(name, attrs, string, kwargs), _siblings(self.node))
+
+    def find_parent(self, name=None, attrs=None, **kwargs):
+        return _first(_tag_matcher(name, attrs, None, kwargs), _ancestors(self.node))
+
+
+def _wrap(node):
+    return String(node) if node.tag in (TEXT_NODE, COMMENT_NODE) else Tag(node)
+
+
+def _children(node):
+    child = node.child
+    while child is not None:
+        yield child
+        child = child.next
+
+
+def _descendants(node):
+    # Document order, not including node itself
+    child = node.child
+    while child is not None:
+        yield child
+        yield from _descendants(child)
+        child = child.next
+
+
+def _following(node):
+    # Everything after node's start tag in document order: its own descendants,
+    # then what follows it (BeautifulSoup's next_elements)
+    yield from _descendants(node)
+    while node is not None:
+        sibling = node.next
+        while sibling is not None:
+            yield sibling
+            yield from _descendants(sibling)
+            sibling = sibling.next
+        node = node.parent
+
+
+def _siblings(node):
+    sibling = node.next
+    while sibling is not None:
+        yield sibling
+        sibling = sibling.next
+
+
+def _ancestors(node):
+    parent = node.parent
+    while parent is not None and not parent.is_document_node:
+        yield parent
+        parent = parent.parent
+
+
+def _visible_strings(node):
+    for child in _children(node):
+        if child.tag == TEXT_NODE:
+            yield child.text_content or ""
+        elif child.tag in HIDDEN_TEXT_TAGS or child.tag == COMMENT_NODE:
+            continue
+        elif child.child is not None:
+            yield from _visible_strings(child)
+
+
+def _first(match, nodes):
+    for node in nodes:
+        found = match(node)
+        if found is not None:
+            return found
+    return None
+
+
+def _search(node, name, attrs, string, kwargs):
+    if string is not None and name is None and not attrs and not kwargs:
+        match = _string_matcher(string)
+    else:
+        selector = _css_selector(name, attrs, string, kwargs)
+        if selector is not None:
+            # Simple tag/class/attribute filters run as a lexbor CSS query
+            return (Tag(found) for found in node.css(selector) if found.mem_id != node.mem_id)
+        match = _tag_matcher(name, attrs, string, kwargs)
+    return (found for found in map(match, _descendants(node)) if found is not None)
+
+
+def _matcher(name, attrs, string, kwargs):
+    if string is not None and name is None and not attrs and not kwargs:
+        return _string_matcher(string)
+    return _tag_matcher(name, attrs, string, kwargs)
+
+
+def _string_matcher(string):
+    def match(node):
+        if node.tag not in (TEXT_NODE, COMMENT_NODE):
+            return None
+        value = String(node)
+        return value if _matches(value, string) else None
+    return match
+
+
+def _tag_matcher(name, attrs, string, kwargs):
+    filters = dict(attrs or {})
+    filters.update(kwargs)
+    if "class_" in filters:
+        filters["class"] = filters.pop("class_")
+
+    def match(node):
+        if node.tag in (TEXT_NODE, COMMENT_NODE) or node.is_document_node:
+            return None
+        if name is not None and not _matches(node.tag, name):
+            return None
+        tag = Tag(node)
+        for key, expected in filters.items():
+            if not _attribute_matches(tag, key, expected):
+                return None
+        if string is not None:
+            value = tag.string
+            if value is None or not _matches(value, string):
+                return None
+        return tag
+    return match
+
+
+def _attribute_matches(tag, key, expected):
+    value = tag.get(key)
+    if expected is True:
+        return value is not None
+    if value is None:
+        return expected is None or expected is False
+    if key == "class":
+        return any(_matches(token, expected) for token in value) or _matches(" ".join(value), expected)
+    return _matches(value, expected)
+
+
+def _matches(value, expected):
+    if expected is True:
+        return value is not None
+    if callable(expected):
+        return bool(expected(value))
+    if isinstance(expected, (list, tuple, set)):
+        return value in expected
+    return value == expected
+
+
+def _css_selector(name, attrs, string, kwargs):
+    # CSS equivalent of a tag/class/attribute filter, or None when the filter
+    # needs BeautifulSoup semantics CSS does not have (strings, callables, ...)
+    if string is not None or not (name is None or isinstance(name, str)):
+        return None
+    filters = dict(attrs or {})
+    filters.update(kwargs)
+    selector = name or "*"
+    for key, expected in filters.items():
+        key = "class" if key == "class_" else key
+        if not isinstance(expected, str) or not key.replace("-", "").isalnum():
+            return None
+        if key == "class":
+            if not expected or expected.split() != [expected]:
+                return None
+            selector += '[class~="{}"]'.format(expected.replace("\\", "\\\\").replace('"', '\\"'))
+        else:
+            selector += '[{}="{}"]'.format(key, expected.replace("\\", "\\\\").replace('"', '\\"'))
+    return selector
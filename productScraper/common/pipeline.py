@@ -0,0 +1,89 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from common import engine
+
+# === Staged run: fetch -> parse -> compare/write ===
+# Rows are fetched concurrently (common.engine), their payloads are parsed in a
+# process pool sized to the machine, and the caller's handler compares and
+# writes one row at a time on the main thread. Stages are joined by bounded
+# queues, so a slow stage holds the others back instead of growing memory.
+PARSE_WORKERS = int(os.environ.get("SCRAPER_PARSE_WORKERS", str(os.cpu_count() or 1)))
+QUEUE_SIZE = int(os.environ.get("SCRAPER_QUEUE_SIZE", "64"))
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def _run_inline(parse_item, payload):
+    future = Future()
+    try:
+        future.set_result(parse_item(payload))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _fetch_stage(rows, row_urls, fetch_item, fetched):
+    try:
+        for row in engine.prefetch_rows(rows, row_urls):
+            try:
+                payload = fetch_item(row)
+            except Exception as e:
+                payload = _Failed(e)
+            fetched.put((row, payload))
+    finally:
+        fetched.put(_DONE)
+
+
+def _parse_stage(fetched, parsed, parse_item, pool):
+    while True:
+        entry = fetched.get()
+        if entry is _DONE:
+            parsed.put(_DONE)
+            return
+        row, payload = entry
+        if isinstance(payload, _Failed):
+            future = Future()
+            future.set_exception(payload.error)
+        elif pool is None:
+            future = _run_inline(parse_item, payload)
+        else:
+            future = pool.submit(parse_item, payload)
+        # Blocks once QUEUE_SIZE parses are waiting on the writer
+        parsed.put((row, payload, future))
+
+
+def run(rows, row_urls, fetch_item, parse_item, handle_result, workers=PARSE_WORKERS, queue_size=QUEUE_SIZE):
+    # fetch_item(row) -> payload runs on the fetch thread; parse_item(payload) runs
+    # in the pool and must be a picklable module-level function; handle_result(row,
+    # payload, parsed) runs on the calling thread in input order. A stage error for
+    # a row is passed to handle_result as the exception in place of `parsed`.
+    fetched = queue.Queue(maxsize=queue_size)
+    parsed = queue.Queue(maxsize=queue_size)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+
+    fetcher = threading.Thread(target=_fetch_stage, args=(rows, row_urls, fetch_item, fetched), daemon=True)
+    parser = threading.Thread(target=_parse_stage, args=(fetched, parsed, parse_item, pool), daemon=True)
+    fetcher.start()
+    parser.start()
+    try:
+        while True:
+            entry = parsed.get()
+            if entry is _DONE:
+                break
+            row, payload, future = entry
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            handle_result(row, payload, result)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
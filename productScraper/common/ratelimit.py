@@ -0,0 +1,181 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+# === Per-host rate limiting ===
+# Every host gets a token bucket (requests per second) and an adaptive limit on
+# requests in flight. Both grow additively while the host answers normally and
+# are halved when it throttles us (AIMD), so we settle near each host's limit.
+INITIAL_RATE = float(os.environ.get("SCRAPER_RATE", "10"))
+MIN_RATE = 0.5
+MAX_RATE = float(os.environ.get("SCRAPER_MAX_RATE", "50"))
+BURST = 10
+
+INITIAL_CONCURRENCY = 4
+MAX_CONCURRENCY = int(os.environ.get("SCRAPER_PER_HOST", "4"))
+
+THROTTLE_STATUSES = (429, 503)
+
+# A burst of throttled responses counts as one decrease within this window
+DECREASE_COOLDOWN = 1.0
+
+# === Retries ===
+MAX_RETRIES = int(os.environ.get("SCRAPER_MAX_RETRIES", "4"))
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+MAX_RETRY_AFTER = 120.0
+
+# Retries allowed per run: a fixed allowance plus a share of all requests, so a
+# host that is down cannot multiply the run's request count
+RETRY_BUDGET_MIN = 20
+RETRY_BUDGET_RATIO = 0.2
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class HostLimiter:
+    def __init__(self, rate=INITIAL_RATE, concurrency=INITIAL_CONCURRENCY):
+        self.rate = rate
+        self.tokens = BURST
+        self.updated = time.monotonic()
+        self.concurrency = float(concurrency)
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+    def _refill(self, now):
+        self.tokens = min(BURST, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.in_flight >= max(1, int(self.concurrency)):
+                    wait = None
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                self.cond.wait(wait)
+
+    def release(self, throttled=False, adjust=True):
+        # Frees the request's slot; `adjust` False leaves rate and concurrency
+        # as they are, for a request that failed for reasons other than the host
+        with self.cond:
+            self.in_flight -= 1
+            if throttled:
+                now = time.monotonic()
+                if now - self.last_decrease >= DECREASE_COOLDOWN:
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    self.last_decrease = now
+            elif adjust:
+                self.rate = min(MAX_RATE, self.rate + 1 / self.rate)
+                self.concurrency = min(MAX_CONCURRENCY, self.concurrency + 1 / self.concurrency)
+            self.cond.notify_all()
+
+    def pause(self, seconds):
+        # Hold every request to this host, e.g. for the length of a Retry-After
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.cond.notify_all()
+
+
+class RetryBudget:
+    def __init__(self, minimum=RETRY_BUDGET_MIN, ratio=RETRY_BUDGET_RATIO):
+        self.minimum = minimum
+        self.ratio = ratio
+        self.requests = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def take(self):
+        with self.lock:
+            if self.retries >= self.minimum + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+retry_budget = RetryBudget()
+
+
+def get_limiter(url):
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter()
+        return _limiters[host]
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+
+def backoff_seconds(attempt):
+    # Full jitter: anywhere between 0 and the capped exponential delay
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def send(url, do_request):
+    # Run do_request() under the host's limiter, retrying throttled responses and
+    # connection errors while the run's retry budget lasts
+    limiter = get_limiter(url)
+    attempt = 0
+    while True:
+        retry_budget.record_request()
+        limiter.acquire()
+        try:
+            response = do_request()
+        except (requests.ConnectionError, requests.Timeout):
+            limiter.release(throttled=True)
+            if attempt >= MAX_RETRIES or not retry_budget.take():
+                raise
+            delay = backoff_seconds(attempt)
+            print(f"⚠️ Connection problem for {url}, retrying in {delay:.1f}s")
+        except BaseException:
+            # Anything else (a broken chunked body, too many redirects, a bad
+            # URL, an interrupt) still gives the slot back, or the host's
+            # requests would queue behind it forever
+            limiter.release(adjust=False)
+            raise
+        else:
+            throttled = response.status_code in THROTTLE_STATUSES
+            limiter.release(throttled=throttled)
+            if not throttled or attempt >= MAX_RETRIES or not retry_budget.take():
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_seconds(attempt)
+            limiter.pause(delay)
+            print(f"⚠️ {response.status_code} from {url}, retrying in {delay:.1f}s")
+        time.sleep(delay)
+        attempt += 1
@@ -0,0 +1,130 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from common import catalog, fetch
+
+# === RegimenPro catalog snapshot ===
+# The regimenmd store is pulled once from its paginated products feed, written to
+# disk, and shared by every brand script that runs while it is fresh. Product
+# JSON requests for RegimenPro URLs are answered from the snapshot. Under
+# SCRAPER_RECORD / SCRAPER_REPLAY the snapshot is built in memory from the
+# recorded catalog pages and the on-disk snapshot is neither read nor written.
+REGIMENPRO_STORE = os.environ.get("REGIMENPRO_STORE", "https://regimenpro.com")
+REGIMENPRO_HOSTS = {
+    host.strip() for host in os.environ.get("REGIMENPRO_HOSTS", "regimenpro.com,www.regimenpro.com").split(",") if host.strip()
+}
+ADMIN_URL = "https://admin.shopify.com/store/regimenmd/products/{}"
+
+SNAPSHOT_MAX_AGE = float(os.environ.get("SCRAPER_SNAPSHOT_MAX_AGE", "12")) * 3600
+FORCE_REFRESH = os.environ.get("SCRAPER_SNAPSHOT_REFRESH", "0") == "1"
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class Snapshot:
+    def __init__(self, store, fetched_at, products):
+        self.store = store
+        self.fetched_at = fetched_at
+        self.products = products
+        # Product URLs name the handle; the product's id (for admin links) and
+        # variants come with the product it finds
+        self.by_handle = {product["handle"]: product for product in products}
+
+    def product_for_url(self, url):
+        handle = catalog.product_handle(url) or urlparse(url).path.rstrip("/").split("/")[-1]
+        return self.by_handle.get(handle)
+
+
+def snapshot_path(store):
+    return os.path.join(fetch.DATA_DIR, f"regimenpro_snapshot_{urlparse(store).netloc}.json")
+
+
+def read_snapshot(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if FORCE_REFRESH or time.time() - data.get("fetched_at", 0) > SNAPSHOT_MAX_AGE:
+        return None
+    return data
+
+
+def build_snapshot(store):
+    if any(fetch.get_fixtures()):
+        # Recording or replaying: the catalog pages go through the archive and
+        # the snapshot stays in memory, so replay output never depends on (or
+        # leaks into) the on-disk snapshot
+        products = catalog.fetch_catalog(store)
+        return Snapshot(store, time.time(), products) if products is not None else None
+
+    path = snapshot_path(store)
+    os.makedirs(fetch.DATA_DIR, exist_ok=True)
+
+    # Other brand scripts started at the same time wait here for the first one
+    # to finish writing, then read its file instead of pulling the store again
+    with open(path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        data = read_snapshot(path)
+        if data is None:
+            products = catalog.fetch_catalog(store)
+            if products is None:
+                return None
+            data = {"store": store, "fetched_at": time.time(), "products": products}
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            print(f"Saved RegimenPro snapshot of {len(products)} products to {path}")
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    return Snapshot(data["store"], data["fetched_at"], data["products"])
+
+
+def get_snapshot():
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            try:
+                _snapshot = build_snapshot(REGIMENPRO_STORE) or False
+            except Exception as e:
+                print(f"⚠️ Could not build RegimenPro snapshot: {e}")
+                _snapshot = False
+        return _snapshot or None
+
+
+def is_regimenpro_url(url):
+    return urlparse(url).netloc in REGIMENPRO_HOSTS
+
+
+def product(url):
+    snapshot = get_snapshot()
+    return snapshot.product_for_url(url) if snapshot else None
+
+
+def admin_url(url, product_id=""):
+    # Shopify admin link for a RegimenPro product URL, using the snapshot's id
+    # when the product is indexed and the given id otherwise
+    found = product(url) if is_regimenpro_url(url) else None
+    if found is not None:
+        product_id = found["id"]
+    return ADMIN_URL.format(product_id)
+
+
+def respond(url):
+    if not is_regimenpro_url(url) or catalog.product_handle(url) is None:
+        return None
+    found = product(url)
+    if found is None:
+        return None
+    body = json.dumps({"product": found}).encode("utf-8")
+    return fetch.make_response(url, body, headers={"Content-Type": "application/json; charset=utf-8"})
+
+
+def enable():
+    fetch.add_responder(respond, first=True)
@@ -0,0 +1,52 @@
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from common import normalize
+
+# === Fuzzy similarity ===
+# score() gives the difflib SequenceMatcher ratio the fuzzy matchers have always
+# used, computing the full alignment only when a cheaper answer could be wrong:
+#   1. equal texts score 1.0
+#   2. texts under LONG_TEXT characters are aligned in full; that is cheap
+#   3. longer texts fail outright when their lengths alone cap the ratio below
+#      the threshold (SequenceMatcher.real_quick_ratio)
+#   4. otherwise the Dice similarity of their character trigram sets estimates
+#      the ratio in one pass, and texts estimated more than MARGIN below the
+#      threshold fail without an alignment
+#   5. anything left (near or above the threshold) is aligned in full
+# A pass is never decided by an estimate, and a fail is only wrong if the
+# estimate is more than MARGIN below the real ratio. MARGIN is the actual safety
+# bound: on description-length text (200+ characters) with random word and
+# character edits the estimate has come out as much as 0.078 below the real
+# ratio, so a smaller margin would turn near-threshold passes into fails. A
+# failed score taken from the estimate or the length bound is approximate.
+LONG_TEXT = 200
+MARGIN = 0.1
+
+
+@lru_cache(maxsize=normalize.MEMO_SIZE)
+def trigrams(s):
+    return frozenset(s[i:i + 3] for i in range(len(s) - 2))
+
+
+def estimate(a, b):
+    # Dice coefficient of the two texts' character trigram sets
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    total = len(grams_a) + len(grams_b)
+    return 2 * len(grams_a & grams_b) / total if total else 1.0
+
+
+def score(a, b, threshold):
+    # (ratio, exact): exact is False when the ratio is known only to be below
+    # the threshold and the value is an estimate
+    if a == b:
+        return 1.0, True
+    if min(len(a), len(b)) < LONG_TEXT:
+        return SequenceMatcher(None, a, b).ratio(), True
+    length_bound = 2 * min(len(a), len(b)) / (len(a) + len(b))
+    if length_bound < threshold:
+        return min(length_bound, estimate(a, b)), False
+    guess = estimate(a, b)
+    if guess + MARGIN < threshold:
+        return guess, False
+    return SequenceMatcher(None, a, b).ratio(), True
@@ -0,0 +1,936 @@
+import csv
+import functools
+import html
+from datetime import datetime
+from urllib.parse import urlparse
+
+from common import batch, blobs, extract, fetch, incremental, normalize, output, parquet, parsers, pipeline, regimenpro, similarity, store, truncate, variants
+
+# === Brand specs ===
+# Each brand script describes what it reads and how it compares as a SPEC dict.
+# compile_plan() turns a spec into a Plan once -- selectors parsed, truncators
+# and matchers built, the page elements to parse collected -- and run() pushes
+# every input row through that same plan on the fetch -> parse -> compare/write
+# pipeline (common.pipeline).
+#
+#   "brand"           name used in messages, and the "<brand> Value" column
+#   "label"           value column name when it is not the brand name
+#   "input_csv", "output_csv", "comparison_csv"
+#   "url_column"      input column holding the brand URL ("Product Urls")
+#   "source"          SOURCE the brand product is read from (Shopify <url>.json)
+#   "fields"          {column: FIELD} scraped from the brand, in output order
+#                     (SHOPIFY_FIELDS when left out)
+#   "regimenpro"      {"source": SOURCE, "fields": {column: FIELD}} for the
+#                     RegimenPro side; columns it does not list reuse the brand's
+#   "compare"         columns compared (every brand column by default)
+#   "matchers"        {column: MATCHER}, "*" for the rest ("exact" by default)
+#   "compare_clean"   [CLEAN] applied to both values before they are compared
+#   "labels"          {"yes", "no", "invalid", "unmatched"} overrides for the
+#                     "Match?" texts
+#   "variants"        "all" (default): columns both sides read from the variant
+#                     are compared for every pair of variants sharing a SKU,
+#                     barcode or option value, and variants without a
+#                     counterpart are reported; "first": the selected variants only
+#   "default"         value for a field no rule finds ("N/A" by default)
+#   "missing"         value for every field of a side that could not be fetched
+#   "timestamp"       add "Date/Time Captured" columns (default True)
+#   "admin_url"       add the "Shopify Admin URL" comparison column (default False)
+#
+# SOURCE   {"type": "shopify" | "page",
+#           "url": "as_is" | "no_query" | "path" | "handle",
+#           "unescape": html.unescape body_html before parsing it,
+#           "product": "embedded" (page's product JSON, else <url>.json) or the
+#                      name a page script assigns the product to ("Shopify.product"),
+#           "variant_column": input column matched against variant titles}
+# FIELD    a RULE, a list of RULEs tried in order until one finds a value, or
+#          {"from": RULE(s), "default": value, "clean": [CLEAN, ...]}
+# RULE     {"product": key}      key of the product JSON
+#          {"variant": key}      key of the selected variant (the first by default)
+#          {"embedded": "sku"}   SKU from the page's embedded product data (the
+#                                selected variant only)
+#          {"text": MODE}        all text of body_html ("nonempty": or nothing)
+#          {"select": SELECTOR(S), "text": MODE}  first match; a list of
+#                                selectors descends one find() per selector.
+#                                Optional: "attr" reads an attribute instead,
+#                                "nonempty" / "unless": markers skip matches,
+#                                "join": sep joins the text of every match
+#          {"after": SELECTOR | None, "contains": word, "next": SELECTOR | None,
+#           "sibling": bool, "text": MODE}  element following a heading whose
+#                                text contains word (None: any text node)
+#          {"accordion": ("dt", "dd"), "labels": [words], "label": word}
+#                                value of the last label element whose first
+#                                matching word is `label`
+#          {"items": SELECTOR, "select": SELECTOR(S), "item": SELECTOR,
+#           "where": (SELECTOR, text), "join": sep}  texts of list items
+#          "in": "page" reads the fetched page instead of body_html
+# MODE     "spaced" get_text(" ", strip=True), "strip", "raw", "strings"
+# CLEAN    "strip", "normalize", "nfkd", ("rstrip", chars), ("remove", chars),
+#          ("cut", markers[, normalize_dashes]), ("drop_prefix", column)
+# MATCHER  "exact", "casefold", "words", "normalized", "price" / ("price", chars
+#          to ignore, "$" by default), ("fuzzy", ratio[, report the ratio when it fails
+#          [, pass at exactly ratio]]),
+#          "list" / ("list", ordered) ingredient or benefit lists as token sets or sequences
+
+SHOPIFY_FIELDS = {
+    "Product Name": {"from": {"product": "title"}, "clean": ["strip"]},
+    "Product Description": {"text": "spaced"},
+    "SKU": {"from": {"variant": "sku"}, "clean": ["strip"]},
+    "Product Price": {"from": {"variant": "price"}, "clean": ["strip"]},
+}
+
+LABELS = {
+    "yes": "✅ Yes",
+    "no": "❌ No",
+    "invalid": "⚠️ Invalid price format",
+    "unmatched": "⚠️ No matching variant",
+}
+
+TEXT_MODES = {
+    "spaced": lambda element: element.get_text(separator=" ", strip=True),
+    "strip": lambda element: element.get_text(strip=True),
+    "raw": lambda element: element.get_text(),
+    "strings": lambda element: "".join(element.find_all(string=True)).strip(),
+}
+
+_plans = {}
+
+
+# === Selectors ===
+def find_args(selector):
+    # find()/find_all() arguments for a parsers.parse_selector() selector
+    name, attr, value, token = parsers.parse_selector(selector)
+    if token is not None:
+        return name, {"class": token}
+    if attr is not None:
+        return name, {attr: value}
+    return name, {}
+
+
+def selector_path(selectors):
+    return [find_args(selector) for selector in ([selectors] if isinstance(selectors, str) else selectors)]
+
+
+def descend(element, path):
+    for name, attrs in path:
+        if element is None:
+            return None
+        element = element.find(name, attrs)
+    return element
+
+
+def heading_matcher(word):
+    word = word.lower()
+    return lambda s: s is not None and word in s.lower()
+
+
+# === Rules ===
+# Each builder takes a rule dict and returns reader(ctx) -> value or None
+def product_rule(rule):
+    key = rule["product"]
+    return lambda ctx: ctx.product.get(key) if ctx.product else None
+
+
+def variant_rule(rule):
+    key = rule["variant"]
+    return lambda ctx: ctx.variant.get(key) if ctx.variant else None
+
+
+def embedded_rule(rule):
+    return lambda ctx: extract.product_sku(ctx.response, ctx.page()) if ctx.response is not None and ctx.primary else None
+
+
+def text_rule(rule):
+    document, text = rule_document(rule), TEXT_MODES[rule["text"]]
+    nonempty = rule.get("nonempty", False)
+
+    def read(ctx):
+        doc = document(ctx)
+        if doc is None:
+            return None
+        found = text(doc)
+        return None if nonempty and not found else found
+    return read
+
+
+def select_rule(rule):
+    document = rule_document(rule)
+    path = selector_path(rule["select"])
+    text = TEXT_MODES[rule.get("text", "strip")]
+    attr = rule.get("attr")
+    join = rule.get("join")
+    skip = None
+    if rule.get("nonempty"):
+        skip = lambda element: not element.get_text(strip=True)
+    elif rule.get("unless"):
+        contains = truncate.Truncator(rule["unless"]).contains
+        skip = lambda element: contains(text(element))
+
+    def read(ctx):
+        doc = descend(document(ctx), path[:-1])
+        if doc is None:
+            return None
+        name, attrs = path[-1]
+        if join is not None:
+            return join.join(text(element) for element in doc.find_all(name, attrs))
+        if skip is not None:
+            element = next((found for found in doc.find_all(name, attrs) if not skip(found)), None)
+        else:
+            element = doc.find(name, attrs)
+        if element is None:
+            return None
+        return element.get(attr) if attr else text(element)
+    return read
+
+
+def after_rule(rule):
+    on_page = rule.get("in") == "page"
+    document = rule_document(rule)
+    text = TEXT_MODES[rule.get("text", "strip")]
+    matches = heading_matcher(rule["contains"])
+    heading = find_args(rule["after"]) if rule["after"] else None
+    following = find_args(rule["next"]) if rule.get("next") else (None, {})
+    step = "find_next_sibling" if rule.get("sibling") else "find_next"
+
+    def find_heading(doc):
+        if heading is None:
+            found = doc.find(string=matches)
+            return found.find_parent() if found is not None else None
+        return doc.find(heading[0], heading[1], string=matches)
+
+    def read(ctx):
+        doc = document(ctx)
+        if doc is None:
+            return None
+        found = find_heading(doc)
+        if found is not None and on_page and not parsers.is_top_level(doc, found):
+            # The heading sits inside another kept element, so what follows it
+            # may not have been parsed; look it up in the whole page
+            found = find_heading(ctx.full_page())
+        if found is None:
+            return None
+        element = getattr(found, step)(*following)
+        return text(element) if element is not None else None
+    return read
+
+
+def accordion_rule(rule):
+    document = rule_document(rule)
+    label_tag, value_tag = rule["accordion"]
+    labels = [label.lower() for label in rule["labels"]]
+    wanted = rule["label"]
+    key = ("accordion", rule.get("in"), label_tag, value_tag, tuple(labels))
+
+    def sections(doc):
+        found = {}
+        for label_element in doc.find_all(label_tag):
+            label = label_element.get_text(strip=True).lower()
+            value = label_element.find_next_sibling(value_tag)
+            if value is None:
+                continue
+            kind = next((word for word in labels if word in label), None)
+            if kind is not None:
+                found[kind] = value.get_text(strip=True)
+        return found
+
+    def read(ctx):
+        doc = document(ctx)
+        if doc is None:
+            return None
+        # Every field of an accordion shares one pass over its labels
+        if key not in ctx.memo:
+            ctx.memo[key] = sections(doc)
+        return ctx.memo[key].get(wanted)
+    return read
+
+
+def items_rule(rule):
+    document = rule_document(rule)
+    path = selector_path(rule["select"])
+    items = find_args(rule["items"])
+    item = find_args(rule["item"]) if rule.get("item") else None
+    join = rule.get("join", ", ")
+    where = None
+    if rule.get("where"):
+        title, wanted = find_args(rule["where"][0]), rule["where"][1].upper()
+        where = lambda element: (found := element.find(*title)) is not None and found.get_text(strip=True).upper() == wanted
+
+    def lists(doc):
+        if where is None:
+            yield descend(doc, path)
+            return
+        # With "where", every section matching the first selector counts
+        name, attrs = path[0]
+        for section in doc.find_all(name, attrs):
+            if where(section):
+                yield descend(section, path[1:])
+
+    def read(ctx):
+        doc = document(ctx)
+        if doc is None:
+            return None
+        texts = []
+        for found in lists(doc):
+            if found is None:
+                continue
+            for element in found.find_all(*items):
+                if item is not None:
+                    element = element.find(*item)
+                    if element is None:
+                        continue
+                texts.append(element.get_text().strip())
+        return join.join(texts) if texts else None
+    return read
+
+
+# In lookup order: "items" rules also carry "select", and most carry "text"
+RULES = {
+    "product": product_rule,
+    "variant": variant_rule,
+    "embedded": embedded_rule,
+    "accordion": accordion_rule,
+    "items": items_rule,
+    "after": after_rule,
+    "select": select_rule,
+    "text": text_rule,
+}
+
+
+def rule_document(rule):
+    if rule.get("in") == "page":
+        return lambda ctx: ctx.page()
+    return lambda ctx: ctx.body()
+
+
+def rule_kind(rule):
+    for kind in RULES:
+        if kind in rule:
+            return kind
+    raise ValueError(f"Unknown extraction rule: {rule!r}")
+
+
+def rule_targets(rule):
+    # Page elements a page rule reads, for parsers.page(..., only=...); None when
+    # it needs the whole page
+    kind = rule_kind(rule)
+    if kind == "embedded":
+        return extract.PRODUCT_DATA_TARGETS
+    if rule.get("in") != "page":
+        return []
+    if kind in ("select", "items"):
+        selectors = rule["select"]
+        return [selectors if isinstance(selectors, str) else selectors[0]]
+    if kind == "after" and rule["after"] and rule.get("next"):
+        return [f"{rule['after']} + {rule['next']}"]
+    return None
+
+
+# === Cleanup ===
+# Each builder returns clean(value, values) -> value; `values` holds the fields
+# already read for the same product
+def cut_clean(markers, normalize_dashes=True):
+    cutoff = truncate.Truncator(markers, normalize_dashes=normalize_dashes)
+    return lambda value, values: cutoff.cut(value)[0]
+
+
+def drop_prefix_clean(column):
+    def clean(value, values):
+        prefix = values.get(column) or ""
+        if prefix and value.lower().startswith(prefix.lower()):
+            return value[len(prefix):].lstrip(" :–-").strip()
+        return value
+    return clean
+
+
+def remove_clean(chars):
+    table = normalize.removal_table(chars)
+    return lambda value, values: value.translate(table)
+
+
+CLEANS = {
+    "strip": lambda: lambda value, values: value.strip(),
+    "normalize": lambda: lambda value, values: normalize.normalize_text(value),
+    "nfkd": lambda: lambda value, values: normalize.nfkd(value),
+    "rstrip": lambda chars: lambda value, values: value.rstrip(chars),
+    "remove": remove_clean,
+    "cut": cut_clean,
+    "drop_prefix": drop_prefix_clean,
+}
+
+
+def build_clean(step):
+    name, args = (step, ()) if isinstance(step, str) else (step[0], step[1:])
+    return CLEANS[name](*args)
+
+
+# === Matchers ===
+# Each builder returns (key, match, kind): key(value) is the form a value is
+# compared in, computed once per product when it is parsed (Plan.forms), and
+# match(key1, key2, labels) -> "Match?" text for keys that differ. Equal keys
+# always match; common.batch decides that for whole columns at once, comparing
+# "price" keys as cents and the rest by hash.
+def same(a, b, labels):
+    return labels["yes"] if a == b else labels["no"]
+
+
+def price_matcher(ignore="$"):
+    # Prices compare as integer cents once the `ignore` characters are removed
+    def match(a, b, labels):
+        if a is None or b is None:
+            return labels["invalid"]
+        return labels["yes"] if a == b else labels["no"]
+    return (lambda value: normalize.cents(value, ignore)), match, "price"
+
+
+def fuzzy_matcher(threshold, report=False, inclusive=False):
+    # Passes above the threshold, or at it too when `inclusive`. A failed ratio
+    # only known approximately (common.similarity) is shown as "~N%"
+    def match(a, b, labels):
+        ratio, exact = similarity.score(a, b, threshold)
+        if ratio > threshold or (inclusive and ratio == threshold):
+            return labels["yes"]
+        if not report:
+            return labels["no"]
+        return f"{labels['no']} ({'' if exact else '~'}{round(ratio * 100)}% match)"
+    return normalize.casefold, match, "text"
+
+
+def list_matcher(ordered=False, shown=5):
+    # Lists compare as sets of tokens (normalize.tokens), or as sequences when
+    # `ordered`; a mismatch between overlapping lists names the items RegimenPro
+    # adds or lacks, or that only the order differs
+    def describe(label, items):
+        items = list(items)
+        more = f" +{len(items) - shown} more" if len(items) > shown else ""
+        return f"{label}: {', '.join(items[:shown])}{more}"
+
+    def match(a, b, labels):
+        if a == b:
+            return labels["yes"]
+        b_set = set(b)
+        removed = [token for token in a if token not in b_set]
+        if not removed and len(a) == len(b):
+            # Same items in another order
+            return f"{labels['no'] if ordered else labels['yes']} (reordered)"
+        if len(removed) == len(a):
+            # Nothing in common (or a placeholder like "N/A" on one side)
+            return labels["no"]
+        a_set = set(a)
+        added = [token for token in b if token not in a_set]
+        changes = []
+        if added:
+            changes.append(describe("added", added))
+        if removed:
+            changes.append(describe("removed", removed))
+        return f"{labels['no']} ({'; '.join(changes)})"
+    return normalize.tokens, match, "text"
+
+
+MATCHERS = {
+    "exact": lambda: (normalize.strip, same, "text"),
+    "casefold": lambda: (normalize.casefold, same, "text"),
+    "words": lambda: (normalize.words, same, "text"),
+    "normalized": lambda: (normalize.normalize_text, same, "text"),
+    "price": price_matcher,
+    "fuzzy": fuzzy_matcher,
+    "list": list_matcher,
+}
+
+
+def build_matcher(matcher):
+    name, args = (matcher, ()) if isinstance(matcher, str) else (matcher[0], matcher[1:])
+    return MATCHERS[name](*args)
+
+
+# === Sources ===
+def source_url(url, style):
+    if style == "no_query":
+        return url.split("?")[0]
+    if style == "path":
+        parsed = urlparse(url)
+        return parsed.scheme + "://" + parsed.netloc + parsed.path
+    if style == "handle":
+        parsed = urlparse(url)
+        path_parts = parsed.path.strip("/").split("/")
+        if "products" not in path_parts:
+            return None
+        return f"{parsed.scheme}://{parsed.netloc}/products/{path_parts[-1]}"
+    return url
+
+
+class Context:
+    # One side of one product while its fields are read: the fetched documents,
+    # parsed lazily and at most once, and the values read so far. A context for
+    # another variant of the product (Side.read_variant) has primary False.
+    # `backend` and `partial` (parse only the side's page targets) default to
+    # what a run uses; common.parity varies them.
+    def __init__(self, side, doc, variant=None, backend=None, partial=True):
+        self.side = side
+        self.doc = doc
+        self.backend = backend
+        self.partial = partial
+        self.product = doc.get("product")
+        self.response = doc.get("response")
+        self.wanted = doc.get("variant")
+        self.variants = None
+        self.variant = variant
+        self.primary = variant is None
+        self.notes = []
+        self.memo = {}
+        self.values = {}
+        self._body = self._page = self._full_page = None
+        if self.product and self.primary:
+            self.variants = variants.VariantIndex(self.product.get("variants"))
+            self.variant = side.select_variant(self.variants, self.wanted, self.notes)
+
+    def body(self):
+        if self._body is None:
+            if self.product is None:
+                return None
+            body_html = self.product.get("body_html") or ""
+            if self.side.unescape:
+                body_html = html.unescape(body_html)
+            self._body = parsers.fragment(body_html, backend=self.backend)
+        return self._body
+
+    def page(self):
+        if self._page is None and self.response is not None:
+            only = self.side.page_targets if self.partial else None
+            self._page = parsers.page(self.response, only=only, backend=self.backend)
+        return self._page
+
+    def full_page(self):
+        if self.side.page_targets is None or not self.partial:
+            return self.page()
+        if self._full_page is None and self.response is not None:
+            self._full_page = parsers.page(self.response, backend=self.backend)
+        return self._full_page
+
+
+class Side:
+    # Compiled reading of one side (brand or RegimenPro): how to fetch it and the
+    # rules, default and cleanup of each field
+    def __init__(self, name, source, fields, default, missing):
+        self.name = name
+        self.type = source.get("type", "shopify")
+        self.url_style = source.get("url", "as_is")
+        self.unescape = source.get("unescape", False)
+        self.product_from = source.get("product")
+        self.variant_column = source.get("variant_column")
+        self.missing = missing
+        self.fields = []
+        self.variant_columns = set()
+        self.reads_embedded = False
+        targets = []
+        for column, field in fields.items():
+            if isinstance(field, dict) and "from" in field:
+                rules, field_default, cleans = field["from"], field.get("default", default), field.get("clean", [])
+            else:
+                rules, field_default, cleans = field, default, []
+            rules = [rules] if isinstance(rules, dict) else list(rules)
+            readers = [RULES[rule_kind(rule)](rule) for rule in rules]
+            if any(rule_kind(rule) == "variant" for rule in rules):
+                self.variant_columns.add(column)
+            for rule in rules:
+                found = rule_targets(rule)
+                targets = None if found is None or targets is None else targets + found
+                self.reads_embedded = self.reads_embedded or rule_kind(rule) == "embedded"
+            self.fields.append((column, readers, field_default, [build_clean(step) for step in cleans]))
+        # Page elements the rules read: None when one reads the whole page, empty
+        # when none reads the page. page_targets is None for both, as both parse it whole
+        self.page_reads = None if targets is None else list(dict.fromkeys(targets))
+        self.page_targets = self.page_reads or None
+
+    def url(self, row_url):
+        return source_url(row_url, self.url_style)
+
+    def fetch_urls(self, row_url):
+        url = self.url(row_url)
+        if url is None:
+            return []
+        return [url + ".json"] if self.type == "shopify" else [url]
+
+    def select_variant(self, index, wanted, notes):
+        if wanted:
+            variant = index.find_size(wanted)
+            if variant is not None:
+                return variant
+            notes.append(f"⚠️ No matching size found for '{wanted}' — using default variant.")
+        return index.first()
+
+    def fetch(self, row_url, row):
+        # {"product", "response", "variant"} for the parse stage, or {"error"}
+        url = self.url(row_url)
+        if url is None:
+            return {"error": f"❌ Invalid {self.name} URL format: {row_url}"}
+        doc = {"variant": row.get(self.variant_column, "").strip() if self.variant_column else ""}
+        try:
+            if self.type == "shopify":
+                response = fetch.get(url + ".json")
+                if response.status_code != 200:
+                    return {"error": f"⚠️ Failed to fetch {self.name} JSON: {response.status_code}"}
+                doc["product"] = fetch.json_body(response).get("product")
+                return doc
+
+            response = fetch.get(url)
+            if response.status_code != 200:
+                return {"error": f"⚠️ Failed to fetch {self.name} page: {response.status_code}"}
+            return self.page_doc(url, response, doc)
+        except Exception as e:
+            return {"error": f"❌ Error fetching {self.name} data for {row_url}: {e}"}
+
+    def page_doc(self, url, response, doc):
+        # doc with a fetched page and the product it embeds or assigns
+        doc["response"] = response
+        if self.product_from == "embedded":
+            # The page usually embeds the same product object as <url>.json
+            doc["product"] = extract.product_json(response)
+            if doc["product"] is None:
+                json_response = fetch.get(source_url(url, "path") + ".json")
+                if json_response.status_code == 200:
+                    doc["product"] = fetch.json_body(json_response).get("product")
+        elif self.product_from:
+            product = extract.assigned_json(response, self.product_from)
+            doc["product"] = product if isinstance(product, dict) else None
+        return doc
+
+    def context(self, doc, backend=None, partial=True):
+        return Context(self, doc, backend=backend, partial=partial)
+
+    def read(self, doc, backend=None, partial=True):
+        # Context holding {column: value} and notes for a fetched doc
+        return self.read_into(self.context(doc, backend, partial))
+
+    def read_into(self, ctx):
+        # ctx with its fields read; pages it already parsed are read again as is
+        if "error" in ctx.doc:
+            ctx.values = {column: self.missing for column, _, _, _ in self.fields}
+            ctx.notes.append(ctx.doc["error"])
+            return ctx
+        self.read_fields(ctx, self.fields)
+        return ctx
+
+    def read_variant(self, ctx, variant, columns):
+        # ctx's values with `columns` read again for another of its product's variants
+        variant_ctx = Context(self, ctx.doc, variant, ctx.backend, ctx.partial)
+        variant_ctx.values = dict(ctx.values)
+        self.read_fields(variant_ctx, [field for field in self.fields if field[0] in columns])
+        ctx.notes.extend(variant_ctx.notes)
+        return variant_ctx.values
+
+    def read_fields(self, ctx, fields):
+        for column, readers, default, cleans in fields:
+            value = None
+            try:
+                for reader in readers:
+                    value = reader(ctx)
+                    if value is not None:
+                        break
+                if value is None:
+                    value = default
+                else:
+                    value = str(value)
+                    for clean in cleans:
+                        value = clean(value, ctx.values)
+            except Exception as e:
+                ctx.notes.append(f"❌ Error reading {self.name} {column}: {e}")
+                value = default
+            ctx.values[column] = value
+
+
+# === Plans ===
+class Plan:
+    def __init__(self, spec):
+        self.spec = spec
+        self.brand = spec["brand"]
+        self.label = spec.get("label", self.brand)
+        self.url_column = spec.get("url_column", "Product Urls")
+        default = spec.get("default", "N/A")
+        missing = spec.get("missing", "N/A")
+
+        source = spec.get("source", {"type": "shopify", "url": "path"})
+        fields = spec.get("fields", SHOPIFY_FIELDS)
+        regimen = spec.get("regimenpro", {})
+        self.compare = [column for column in spec.get("compare", fields) if column in fields]
+        regimen_fields = dict(regimen.get("fields", {}))
+        for column in self.compare:
+            regimen_fields.setdefault(column, fields[column])
+        regimen_source = regimen.get("source", {"type": "shopify", "unescape": source.get("unescape", False)})
+        self.brand_side = Side(self.brand, source, fields, default, missing)
+        self.regimen_side = Side("RegimenPro", regimen_source, regimen_fields, default, missing)
+
+        matchers = spec.get("matchers", {})
+        fallback = matchers.get("*", "exact")
+        self.matchers = {column: build_matcher(matchers.get(column, fallback)) for column in self.compare}
+        self.compare_clean = [build_clean(step) for step in spec.get("compare_clean", [])]
+        self.labels = dict(LABELS, **spec.get("labels", {}))
+        self.timestamp = spec.get("timestamp", True)
+        self.admin_url = spec.get("admin_url", False)
+        self.all_variants = spec.get("variants", "all") == "all"
+        # Compared per variant pair when both sides read them from the variant
+        self.variant_columns = [
+            column for column in self.compare
+            if column in self.brand_side.variant_columns and column in self.regimen_side.variant_columns
+        ]
+        self.product_columns = [column for column in self.compare if column not in self.variant_columns]
+        self.version = incremental.plan_version(spec)
+
+        timestamp_column = ["Date/Time Captured"] if self.timestamp else []
+        self.scraped_fieldnames = ["Product URL"] + list(fields) + timestamp_column
+        self.comparison_fieldnames = (
+            ["Product URL"] + (["Shopify Admin URL"] if self.admin_url else [])
+            + ["Field", f"{self.label} Value", "RegimenPro Value", "Match?"] + timestamp_column
+        )
+
+    def __reduce__(self):
+        # Pool workers rebuild the plan from its spec, once per process
+        return load_plan, (self.spec,)
+
+    def urls(self, row):
+        return row[self.url_column].strip(), row["RegimenPro Urls"].strip()
+
+    def row_urls(self, row):
+        brand_url, regimen_url = self.urls(row)
+        return self.brand_side.fetch_urls(brand_url) + self.regimen_side.fetch_urls(regimen_url)
+
+    def fetch(self, row):
+        # (brand doc, RegimenPro doc, (brand URL, RegimenPro URL))
+        urls = self.urls(row)
+        return self.brand_side.fetch(urls[0], row), self.regimen_side.fetch(urls[1], row), urls
+
+    def forms(self, values, columns):
+        # {column: (value as shown in the comparison, matcher key)} for the
+        # compared columns, computed once next to the raw values
+        forms = {}
+        for column in columns:
+            value = values[column]
+            for clean in self.compare_clean:
+                value = clean(value, values)
+            forms[column] = (value, self.matchers[column][0](value))
+        return forms
+
+    def variant_pairs(self, brand, regimen):
+        # [(brand variant, RegimenPro variant)] to compare, either one None for a
+        # variant without a counterpart, or None to compare the selected variants
+        if not self.all_variants or brand.variant is None or regimen.variant is None:
+            return None
+        if brand.wanted or regimen.wanted:
+            # The input row names the size: pair that variant with its counterpart
+            if brand.wanted:
+                return [(brand.variant, regimen.variants.counterpart(brand.variant) or regimen.variant)]
+            return [(brand.variants.counterpart(regimen.variant) or brand.variant, regimen.variant)]
+        if len(brand.variants) <= 1 and len(regimen.variants) <= 1:
+            return None
+        return brand.variants.pairs(regimen.variants)
+
+    def side_forms(self, side, ctx, variant):
+        if variant is None:
+            return None
+        values = ctx.values if variant is ctx.variant else side.read_variant(ctx, variant, self.variant_columns)
+        return self.forms(values, self.variant_columns)
+
+    def variant_forms(self, brand, regimen):
+        # [(variant label or None, brand forms, RegimenPro forms)] of the variant columns
+        if not self.variant_columns:
+            return []
+        pairs = self.variant_pairs(brand, regimen)
+        if pairs is None:
+            return [(None, self.forms(brand.values, self.variant_columns), self.forms(regimen.values, self.variant_columns))]
+        # One matched pair keeps the plain column names
+        labeled = len(pairs) > 1 or None in pairs[0]
+        return [
+            (
+                variants.variant_label(brand_variant or regimen_variant) if labeled else None,
+                self.side_forms(self.brand_side, brand, brand_variant),
+                self.side_forms(self.regimen_side, regimen, regimen_variant),
+            )
+            for brand_variant, regimen_variant in pairs
+        ]
+
+    def parse(self, docs, reuse_from=None):
+        # With reuse_from, (results path, run id or None) from run(), the
+        # product's inputs are hashed here in the parse worker, through the same
+        # contexts (and partially parsed pages) the fields are then read from,
+        # and a product with the same hash in that run is reused instead
+        brand_doc, regimen_doc, urls = docs
+        brand = self.brand_side.context(brand_doc)
+        regimen = self.regimen_side.context(regimen_doc)
+        input_hash = None
+        if reuse_from is not None:
+            input_hash = incremental.input_hash(self.version, urls, (brand, regimen))
+            previous = store.reused_product(reuse_from, self.brand, input_hash) if input_hash else None
+            if previous is not None:
+                return {"reused": previous, "input_hash": input_hash}
+        self.brand_side.read_into(brand)
+        self.regimen_side.read_into(regimen)
+        return {
+            "input_hash": input_hash,
+            "brand": brand.values,
+            "regimenpro": regimen.values,
+            "comparisons": self.comparisons(brand, regimen),
+            "variants": {"brand": variant_snapshots(brand), "regimenpro": variant_snapshots(regimen)},
+            "sources": raw_sources("brand", brand_doc) + raw_sources("regimenpro", regimen_doc) if blobs.BLOBS_ENABLED else [],
+            "notes": brand.notes + regimen.notes,
+        }
+
+    def comparisons(self, brand, regimen):
+        # [(field, column, brand form, RegimenPro form)] in output order, a form
+        # being (value shown, matcher key) or None for a variant only one side has
+        product_forms = (None, self.forms(brand.values, self.product_columns), self.forms(regimen.values, self.product_columns))
+        variant_forms = self.variant_forms(brand, regimen)
+        comparisons = []
+        for column in self.compare:
+            compared = [product_forms] if column in self.product_columns else variant_forms
+            for label, brand_forms, regimen_forms in compared:
+                comparisons.append((
+                    column if label is None else f"{column} ({label})",
+                    column,
+                    brand_forms[column] if brand_forms else None,
+                    regimen_forms[column] if regimen_forms else None,
+                ))
+        return comparisons
+
+    def match(self, products):
+        # [(field, column, brand value, RegimenPro value, "Match?")] for each
+        # product's comparisons, a batch of products matched column by column
+        pairs = [
+            (column, brand[1], regimen[1])
+            for comparisons in products
+            for _, column, brand, regimen in comparisons
+            if brand is not None and regimen is not None
+        ]
+        matches = iter(batch.match(pairs, self.matchers, self.labels))
+        matched = []
+        for comparisons in products:
+            rows = []
+            for field, column, brand, regimen in comparisons:
+                if brand is None or regimen is None:
+                    # A variant only one side has
+                    value1 = brand[0] if brand else self.brand_side.missing
+                    value2 = regimen[0] if regimen else self.regimen_side.missing
+                    rows.append((field, column, value1, value2, self.labels["unmatched"]))
+                else:
+                    rows.append((field, column, brand[0], regimen[0], next(matches)))
+            matched.append(rows)
+        return matched
+
+
+def variant_snapshots(ctx):
+    # (position, id, title, SKU, barcode, price) of each variant a side read
+    if ctx.variants is None:
+        return []
+    return [
+        (position, str(variant.get("id", "")), variant.get("title"), variant.get("sku"), variant.get("barcode"), variant.get("price"))
+        for position, variant in enumerate(ctx.variants.variants)
+    ]
+
+
+def raw_sources(side, doc):
+    # [(side, kind, blob hash)] of the raw body_html and page body a side fetched
+    sources = []
+    body_html = (doc.get("product") or {}).get("body_html")
+    if body_html:
+        sources.append((side, "body_html", blobs.put(body_html)))
+    response = doc.get("response")
+    if response is not None:
+        sources.append((side, "page", blobs.put(response.content)))
+    return sources
+
+
+def compile_plan(spec):
+    plan = Plan(spec)
+    _plans[plan.brand] = plan
+    return plan
+
+
+def load_plan(spec):
+    plan = _plans.get(spec["brand"])
+    if plan is None or plan.spec != spec:
+        plan = compile_plan(spec)
+    return plan
+
+
+def run(plan):
+    # Products go to the results store (common.store) every WRITE_BATCH
+    # products, comparisons matched a batch at a time so memory stays flat, and
+    # the CSVs are exported from the store when the run ends. A product whose
+    # inputs hash the same as one in the latest complete run (common.incremental)
+    # skips reading its fields and comparison and carries the stored result forward.
+    results = store.Run(plan)
+    reuse_from = (results.path, results.reuse_run()) if incremental.ENABLED else None
+    pending = []
+    counts = {"evaluated": 0, "reused": 0}
+
+    def write_batch():
+        # Taken off `pending` first: a batch whose insert fails (store locked,
+        # disk full) is rolled back and dropped, not retried by the flush below
+        # where it would fail again and hide the original error
+        products = pending[:]
+        pending.clear()
+        matched = plan.match([product["comparisons"] for product in products])
+        results.add(list(zip(products, matched)))
+
+    def handle_result(row, docs, parsed):
+        brand_url, regimen_url = plan.urls(row)
+        print(f"Loaded {plan.brand} URL:", brand_url)
+        print("Loaded RegimenPro URL:", regimen_url)
+
+        if isinstance(parsed, Exception):
+            print(f"❌ Error processing {brand_url}: {parsed}")
+            return
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if "reused" in parsed:
+            product_id, run_id = parsed["reused"]
+            print(f"✅ Unchanged since run {run_id}; reusing its result")
+            counts["reused"] += 1
+            pending.append({"url": brand_url, "timestamp": timestamp, "reused_from": product_id, "comparisons": []})
+            if len(pending) >= output.WRITE_BATCH:
+                write_batch()
+            return
+
+        for note in parsed["notes"]:
+            print(note)
+
+        counts["evaluated"] += 1
+        admin_url = ""
+        if plan.admin_url:
+            product = docs[1].get("product") or {}
+            admin_url = regimenpro.admin_url(regimen_url, product.get("id", ""))
+        pending.append({
+            "url": brand_url,
+            "regimen_url": regimen_url,
+            "admin_url": admin_url,
+            "timestamp": timestamp,
+            **parsed,
+        })
+        if len(pending) >= output.WRITE_BATCH:
+            write_batch()
+
+    status = "failed"
+    parquet_paths = []
+    try:
+        with open(plan.spec["input_csv"], newline='') as infile:
+            reader = csv.DictReader(infile)
+            parse_item = functools.partial(plan.parse, reuse_from=reuse_from)
+            pipeline.run(reader, plan.row_urls, plan.fetch, parse_item, handle_result)
+        write_batch()
+        status = "complete"
+    except KeyboardInterrupt:
+        status = "interrupted"
+        raise
+    finally:
+        if pending:
+            write_batch()
+        results.finish(status)
+        results.export(complete=status == "complete")
+        blobs.ensure_dictionary()
+        if parquet.PARQUET_DIR and status == "complete":
+            parquet_paths = parquet.export_run(results.db, results.id, parquet.PARQUET_DIR)
+        results.close()
+
+    print(f"Re-evaluated {counts['evaluated']} products, reused {counts['reused']} unchanged since an earlier run")
+    print(f"✅ Done! Run {results.id} saved to {store.RESULTS_PATH} and exported to:")
+    print("   -", plan.spec["output_csv"])
+    print("   -", plan.spec["comparison_csv"])
+    for path in parquet_paths:
+        print("   -", path)
@@ -0,0 +1,393 @@
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from common import catalog, fetch, output
+
+# === Results store ===
+# Every run is kept in a local SQLite database (WAL mode) instead of only in the
+# two CSVs it overwrites: the run, each product's scraped and RegimenPro values,
+# a snapshot of both sides' variants, and every field comparison. A write batch
+# of products goes in as one transaction, and the CSVs are exported from the
+# store when the run ends. A product reused by an incremental run
+# (common.incremental) is copied forward with reused_from pointing at the
+# product it was evaluated as. The raw body_html and page bodies each product
+# was read from are referenced by their hash in the blob store (common.blobs).
+# Past runs can be queried across brands:
+#   cd productScraper && python -m common.store runs [brand]
+#   python -m common.store products <run id>
+#   python -m common.store sources <run id> [url]
+#   python -m common.store mismatches Obagi "Product Price" 30
+#   python -m common.store export <run id> <scraped.csv> <comparison.csv>
+RESULTS_PATH = os.environ.get("SCRAPER_RESULTS", os.path.join(fetch.DATA_DIR, "results.sqlite3"))
+
+# (process id, path) -> read connection used by reused_product()
+_readers = {}
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        brand TEXT,
+        label TEXT,
+        status TEXT,
+        started_at TEXT,
+        finished_at TEXT,
+        input_csv TEXT,
+        output_csv TEXT,
+        comparison_csv TEXT,
+        scraped_columns TEXT,
+        comparison_columns TEXT
+    );
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER REFERENCES runs (id),
+        brand TEXT,
+        url TEXT,
+        handle TEXT,
+        regimen_url TEXT,
+        regimen_handle TEXT,
+        admin_url TEXT,
+        captured_at TEXT,
+        brand_values TEXT,
+        regimen_values TEXT,
+        input_hash TEXT,
+        reused_from INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS variants (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER REFERENCES runs (id),
+        product_id INTEGER REFERENCES products (id),
+        side TEXT,
+        position INTEGER,
+        variant_id TEXT,
+        title TEXT,
+        sku TEXT,
+        barcode TEXT,
+        price TEXT
+    );
+    CREATE TABLE IF NOT EXISTS sources (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER REFERENCES runs (id),
+        product_id INTEGER REFERENCES products (id),
+        side TEXT,
+        kind TEXT,
+        blob TEXT
+    );
+    CREATE TABLE IF NOT EXISTS comparisons (
+        id INTEGER PRIMARY KEY,
+        run_id INTEGER REFERENCES runs (id),
+        product_id INTEGER REFERENCES products (id),
+        field TEXT,
+        column_name TEXT,
+        brand_value TEXT,
+        regimen_value TEXT,
+        match TEXT,
+        status TEXT
+    );
+"""
+
+# Columns added since the first version of the schema, for existing stores
+COLUMNS = {
+    "products": [("input_hash", "TEXT"), ("reused_from", "INTEGER")],
+}
+
+INDEXES = """
+    CREATE INDEX IF NOT EXISTS runs_brand ON runs (brand, started_at);
+    CREATE INDEX IF NOT EXISTS products_run ON products (run_id);
+    CREATE INDEX IF NOT EXISTS products_brand ON products (brand, captured_at);
+    CREATE INDEX IF NOT EXISTS products_handle ON products (handle);
+    CREATE INDEX IF NOT EXISTS products_input ON products (brand, input_hash);
+    CREATE INDEX IF NOT EXISTS variants_run ON variants (run_id);
+    CREATE INDEX IF NOT EXISTS variants_product ON variants (product_id);
+    CREATE INDEX IF NOT EXISTS variants_sku ON variants (sku);
+    CREATE INDEX IF NOT EXISTS sources_product ON sources (product_id);
+    CREATE INDEX IF NOT EXISTS sources_blob ON sources (blob);
+    CREATE INDEX IF NOT EXISTS comparisons_run ON comparisons (run_id);
+    CREATE INDEX IF NOT EXISTS comparisons_product ON comparisons (product_id);
+    CREATE INDEX IF NOT EXISTS comparisons_status ON comparisons (column_name, status);
+    CREATE VIEW IF NOT EXISTS comparison_rows AS
+        SELECT comparisons.id, comparisons.run_id, products.brand, products.url, products.handle,
+               products.admin_url, products.captured_at, comparisons.field, comparisons.column_name,
+               comparisons.brand_value, comparisons.regimen_value, comparisons.match, comparisons.status
+        FROM comparisons JOIN products ON products.id = comparisons.product_id;
+"""
+
+
+def now():
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def connect(path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    for table, columns in COLUMNS.items():
+        existing = {row[1] for row in db.execute(f"PRAGMA table_info({table})")}
+        for name, kind in columns:
+            if name not in existing:
+                db.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+    db.executescript(INDEXES)
+    return db
+
+
+def match_status(match, labels):
+    # "match", "mismatch", "invalid" or "unmatched" for a "Match?" text
+    for status, label in (("invalid", "invalid"), ("unmatched", "unmatched"), ("match", "yes"), ("mismatch", "no")):
+        if match.startswith(labels[label]):
+            return status
+    return None
+
+
+def handle_of(url):
+    if not url:
+        return None
+    return catalog.product_handle(url) or url.split("?")[0].rstrip("/").split("/")[-1]
+
+
+def reused_product(reuse_from, brand, input_hash):
+    # (product id, run id) of the brand's product with input_hash in the run of
+    # reuse_from, (results path, run id or None), found through products_input.
+    # Parse workers call this, each on a read connection of its own
+    path, run_id = reuse_from
+    if run_id is None:
+        return None
+    key = (os.getpid(), path)
+    db = _readers.get(key)
+    if db is None:
+        db = _readers[key] = sqlite3.connect(path, check_same_thread=False)
+    found = db.execute(
+        "SELECT id, run_id FROM products WHERE brand = ? AND input_hash = ? AND run_id = ? ORDER BY id LIMIT 1",
+        (brand, input_hash, run_id),
+    ).fetchone()
+    return tuple(found) if found else None
+
+
+class Run:
+    # One run of a brand plan: products and their comparisons are added a batch
+    # at a time, and finish() marks the run complete, failed or interrupted
+    def __init__(self, plan, path=RESULTS_PATH):
+        self.plan = plan
+        self.path = path
+        self.db = connect(path)
+        spec = plan.spec
+        self.id = self.db.execute(
+            "INSERT INTO runs (brand, label, status, started_at, input_csv, output_csv, comparison_csv,"
+            " scraped_columns, comparison_columns) VALUES (?, ?, 'running', ?, ?, ?, ?, ?, ?)",
+            (
+                plan.brand, plan.label, now(), spec["input_csv"], spec["output_csv"], spec["comparison_csv"],
+                json.dumps(plan.scraped_fieldnames), json.dumps(plan.comparison_fieldnames),
+            ),
+        ).lastrowid
+
+    def reuse_run(self):
+        # Id of the brand's latest complete run, or None. Reused products are
+        # copied into each run with their input hash, so that run holds every
+        # product still unchanged (see reused_product)
+        (run_id,) = self.db.execute(
+            "SELECT MAX(id) FROM runs WHERE brand = ? AND status = 'complete' AND id != ?",
+            (self.plan.brand, self.id),
+        ).fetchone()
+        return run_id
+
+    def add(self, products):
+        # products: [(product, [(field, column, brand value, RegimenPro value, match)])]
+        # with product a dict of url, regimen_url, admin_url, timestamp,
+        # input_hash, brand, regimenpro, variants and sources, or of url, timestamp and
+        # reused_from for a stored product carried forward; all in one transaction
+        self.db.execute("BEGIN")
+        try:
+            for product, compared in products:
+                if "reused_from" in product:
+                    self.reuse(product["reused_from"], product["timestamp"])
+                    continue
+                product_id = self.db.execute(
+                    "INSERT INTO products (run_id, brand, url, handle, regimen_url, regimen_handle, admin_url,"
+                    " captured_at, brand_values, regimen_values, input_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.id, self.plan.brand, product["url"], handle_of(product["url"]),
+                        product["regimen_url"], handle_of(product["regimen_url"]), product["admin_url"],
+                        product["timestamp"], json.dumps(product["brand"]), json.dumps(product["regimenpro"]),
+                        product["input_hash"],
+                    ),
+                ).lastrowid
+                self.db.executemany(
+                    "INSERT INTO variants (run_id, product_id, side, position, variant_id, title, sku, barcode, price)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (self.id, product_id, side, *snapshot)
+                        for side, snapshots in product["variants"].items()
+                        for snapshot in snapshots
+                    ],
+                )
+                self.db.executemany(
+                    "INSERT INTO sources (run_id, product_id, side, kind, blob) VALUES (?, ?, ?, ?, ?)",
+                    [(self.id, product_id, *source) for source in product.get("sources", [])],
+                )
+                self.db.executemany(
+                    "INSERT INTO comparisons (run_id, product_id, field, column_name, brand_value, regimen_value,"
+                    " match, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (self.id, product_id, *row, match_status(row[-1], self.plan.labels))
+                        for row in compared
+                    ],
+                )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def reuse(self, source_id, captured_at):
+        # Copies a stored product, its variants, sources and comparisons into this run
+        product_id = self.db.execute(
+            "INSERT INTO products (run_id, brand, url, handle, regimen_url, regimen_handle, admin_url, captured_at,"
+            " brand_values, regimen_values, input_hash, reused_from)"
+            " SELECT ?, brand, url, handle, regimen_url, regimen_handle, admin_url, ?, brand_values, regimen_values,"
+            " input_hash, COALESCE(reused_from, id) FROM products WHERE id = ?",
+            (self.id, captured_at, source_id),
+        ).lastrowid
+        self.db.execute(
+            "INSERT INTO variants (run_id, product_id, side, position, variant_id, title, sku, barcode, price)"
+            " SELECT ?, ?, side, position, variant_id, title, sku, barcode, price FROM variants"
+            " WHERE product_id = ? ORDER BY id",
+            (self.id, product_id, source_id),
+        )
+        self.db.execute(
+            "INSERT INTO sources (run_id, product_id, side, kind, blob)"
+            " SELECT ?, ?, side, kind, blob FROM sources WHERE product_id = ? ORDER BY id",
+            (self.id, product_id, source_id),
+        )
+        self.db.execute(
+            "INSERT INTO comparisons (run_id, product_id, field, column_name, brand_value, regimen_value, match, status)"
+            " SELECT ?, ?, field, column_name, brand_value, regimen_value, match, status FROM comparisons"
+            " WHERE product_id = ? ORDER BY id",
+            (self.id, product_id, source_id),
+        )
+
+    def finish(self, status):
+        self.db.execute("UPDATE runs SET status = ?, finished_at = ? WHERE id = ?", (status, now(), self.id))
+
+    def export(self, complete=True):
+        export_run(self.db, self.id, complete=complete)
+
+    def close(self):
+        self.db.close()
+
+
+def run_info(db, run_id):
+    row = db.execute(
+        "SELECT output_csv, comparison_csv, label, scraped_columns, comparison_columns FROM runs WHERE id = ?",
+        (run_id,),
+    ).fetchone()
+    if row is None:
+        raise ValueError(f"No run {run_id} in the results store")
+    output_csv, comparison_csv, label, scraped_columns, comparison_columns = row
+    return output_csv, comparison_csv, label, json.loads(scraped_columns), json.loads(comparison_columns)
+
+
+def export_run(db, run_id, output_csv=None, comparison_csv=None, complete=True):
+    # Writes a run's scraped and comparison CSVs from the store, streaming rows
+    # from the database; an incomplete run is left in the .partial files
+    default_output, default_comparison, label, scraped_columns, comparison_columns = run_info(db, run_id)
+    outputs = [
+        (output_csv or default_output, scraped_columns, scraped_rows(db, run_id)),
+        (comparison_csv or default_comparison, comparison_columns, comparison_rows(db, run_id, label)),
+    ]
+    for path, columns, rows in outputs:
+        writer = output.CsvOutput(path, columns)
+        try:
+            for row in rows:
+                writer.write({column: row.get(column, "") for column in columns})
+        except BaseException:
+            writer.abandon()
+            raise
+        if complete:
+            writer.commit()
+        else:
+            writer.abandon()
+
+
+def scraped_rows(db, run_id):
+    for url, captured_at, values in db.execute(
+        "SELECT url, captured_at, brand_values FROM products WHERE run_id = ? ORDER BY id", (run_id,)
+    ):
+        yield {"Product URL": url, **json.loads(values), "Date/Time Captured": captured_at}
+
+
+def comparison_rows(db, run_id, label):
+    for url, admin_url, captured_at, field, brand_value, regimen_value, match in db.execute(
+        "SELECT url, admin_url, captured_at, field, brand_value, regimen_value, match"
+        " FROM comparison_rows WHERE run_id = ? ORDER BY id", (run_id,)
+    ):
+        yield {
+            "Product URL": url,
+            "Shopify Admin URL": admin_url,
+            "Field": field,
+            f"{label} Value": brand_value,
+            "RegimenPro Value": regimen_value,
+            "Match?": match,
+            "Date/Time Captured": captured_at,
+        }
+
+
+def print_rows(cursor):
+    writer = csv.writer(sys.stdout)
+    writer.writerow([description[0] for description in cursor.description])
+    writer.writerows(cursor)
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    db = connect()
+    if command == "runs":
+        query = (
+            "SELECT id, brand, status, started_at, finished_at, output_csv,"
+            " (SELECT COUNT(*) FROM products WHERE run_id = runs.id AND reused_from IS NULL) AS evaluated,"
+            " (SELECT COUNT(*) FROM products WHERE run_id = runs.id AND reused_from IS NOT NULL) AS reused"
+            " FROM runs"
+        )
+        params = ()
+        if args:
+            query += " WHERE brand = ?"
+            params = (args[0],)
+        print_rows(db.execute(query + " ORDER BY id DESC", params))
+    elif command == "products" and len(args) == 1:
+        print_rows(db.execute(
+            "SELECT id, url, captured_at, CASE WHEN reused_from IS NULL THEN 'evaluated' ELSE 'reused' END AS result,"
+            " reused_from FROM products WHERE run_id = ? ORDER BY id",
+            (int(args[0]),),
+        ))
+    elif command == "sources" and args:
+        query = (
+            "SELECT products.url, products.captured_at, side, kind, blob FROM sources"
+            " JOIN products ON products.id = sources.product_id WHERE sources.run_id = ?"
+        )
+        params = [int(args[0])]
+        if len(args) > 1:
+            query += " AND products.url = ?"
+            params.append(args[1])
+        print_rows(db.execute(query + " ORDER BY sources.id", params))
+    elif command == "mismatches" and args:
+        brand, column, days = args[0], args[1] if len(args) > 1 else None, int(args[2]) if len(args) > 2 else 30
+        query = (
+            "SELECT run_id, captured_at, url, field, brand_value, regimen_value, match FROM comparison_rows"
+            " WHERE brand = ? AND status = 'mismatch' AND captured_at >= datetime('now', 'localtime', ?)"
+        )
+        params = [brand, f"-{days} days"]
+        if column:
+            query += " AND column_name = ?"
+            params.append(column)
+        print_rows(db.execute(query + " ORDER BY id", params))
+    elif command == "export" and len(args) == 3:
+        export_run(db, int(args[0]), args[1], args[2])
+        print(f"✅ Exported run {args[0]} to {args[1]} and {args[2]}")
+    else:
+        print("Usage: python -m common.store runs [brand]")
+        print("       python -m common.store products <run id>")
+        print("       python -m common.store sources <run id> [url]")
+        print("       python -m common.store mismatches <brand> [column] [days]")
+        print("       python -m common.store export <run id> <scraped.csv> <comparison.csv>")
+        sys.exit(2)
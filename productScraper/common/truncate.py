@@ -0,0 +1,57 @@
+import re
+
+# === Description truncation ===
+# Brand descriptions run on into "Ingredients", "How to Use" and similar sections.
+# A Truncator compiles a brand's markers into one case-insensitive pattern and
+# cuts a description at the earliest of them in a single scan, normalizing
+# dashes in the same pass: "-Use" loses its hyphen and en/em dashes become "-"
+# (the old .replace("-Use", "Use").replace("–", "-").replace("—", "-") chain).
+DASH_PATTERN = r"(?-i:-(?=Use))|[–—]"
+
+
+def normalized_marker_pattern(marker):
+    # Matches the raw text that dash normalization turns into `marker`, so markers
+    # are found as if the text had been normalized first: a hyphen may precede any
+    # "Use" in it, and a "-" in it stands for any dash the normalization keeps
+    pieces = []
+    for i, char in enumerate(marker.replace("–", "-").replace("—", "-")):
+        if marker[i:i + 3].lower() == "use":
+            pieces.append(r"(?-i:-(?=Use))?")
+        pieces.append(r"(?:[–—]|-(?!(?-i:Use)))" if char == "-" else re.escape(char))
+    return "".join(pieces)
+
+
+class Truncator:
+    def __init__(self, markers, normalize_dashes=True):
+        self.markers = list(markers)
+        self.normalize_dashes = normalize_dashes
+        if normalize_dashes:
+            marker_patterns = [normalized_marker_pattern(marker) for marker in self.markers]
+        else:
+            marker_patterns = [re.escape(marker) for marker in self.markers]
+        # "(?!)" never matches, for a brand with no markers
+        alternatives = "|".join(marker_patterns) or "(?!)"
+        if normalize_dashes:
+            pattern = f"(?P<dash>{DASH_PATTERN})|(?P<marker>{alternatives})"
+        else:
+            pattern = f"(?P<marker>{alternatives})"
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.literal_pattern = re.compile("|".join(map(re.escape, self.markers)) or "(?!)", re.IGNORECASE)
+
+    def cut(self, text):
+        # (text before the earliest marker, True) or (whole text, False), with
+        # dashes normalized when the brand asks for it
+        parts = []
+        start = 0
+        for match in self.pattern.finditer(text):
+            parts.append(text[start:match.start()])
+            if match.lastgroup == "marker":
+                return "".join(parts), True
+            parts.append("" if match.group() == "-" else "-")
+            start = match.end()
+        parts.append(text[start:])
+        return "".join(parts), False
+
+    def contains(self, text):
+        # Whether any marker appears in text as written (no dash normalization)
+        return self.literal_pattern.search(text) is not None
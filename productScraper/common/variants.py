@@ -0,0 +1,96 @@
+from common import normalize
+
+# === Variant index ===
+# A product's variants keyed by SKU, barcode and normalized option values
+# ("1.7 Fl. Oz" == "1.7oz"), so a size named in the input CSV or a variant on
+# the other store is found with a dict lookup however many variants there are.
+OPTION_KEYS = ("title", "option1", "option2", "option3")
+# Shopify's title for the only variant of a product without options
+DEFAULT_TITLE = "Default Title"
+
+
+def variant_keys(variant):
+    # Lookup keys of one variant, strongest first
+    keys = []
+    sku = str(variant.get("sku") or "").strip()
+    if sku:
+        keys.append(("sku", sku.lower()))
+    barcode = str(variant.get("barcode") or "").strip()
+    if barcode:
+        keys.append(("barcode", barcode))
+    for option in OPTION_KEYS:
+        value = str(variant.get(option) or "").strip()
+        if value and value != DEFAULT_TITLE:
+            keys.append(("option", normalize.size(value)))
+    return keys
+
+
+def variant_label(variant):
+    # How a variant is named in comparison rows
+    title = str(variant.get("title") or "").strip()
+    if title and title != DEFAULT_TITLE:
+        return title
+    return str(variant.get("sku") or variant.get("id") or "").strip()
+
+
+class VariantIndex:
+    def __init__(self, variants):
+        self.variants = [variant for variant in variants or [] if isinstance(variant, dict)]
+        self.keys = []
+        self.index = {}
+        for position, variant in enumerate(self.variants):
+            keys = variant_keys(variant)
+            self.keys.append(keys)
+            for key in keys:
+                # The first variant with a key keeps it
+                self.index.setdefault(key, position)
+
+    def __len__(self):
+        return len(self.variants)
+
+    def first(self):
+        return self.variants[0] if self.variants else None
+
+    def find_size(self, size):
+        # The variant whose title or an option is `size`, or None
+        position = self.index.get(("option", normalize.size(size)))
+        return self.variants[position] if position is not None else None
+
+    def counterpart(self, variant):
+        # The variant sharing the SKU, barcode or an option value of `variant`
+        # (from another product), or None
+        for key in variant_keys(variant):
+            position = self.index.get(key)
+            if position is not None:
+                return self.variants[position]
+        return None
+
+    def pairs(self, other):
+        # [(variant, other variant)] pairing each variant with the first unpaired
+        # variant of `other` sharing its SKU, barcode or an option value, then
+        # (variant, None) / (None, other variant) for those left without a
+        # counterpart. When nothing pairs, the first variants are paired so the
+        # product is still compared as a whole.
+        paired = []
+        taken = set()
+        unpaired = []
+        for position, keys in enumerate(self.keys):
+            match = None
+            for key in keys:
+                found = other.index.get(key)
+                if found is not None and found not in taken:
+                    match = found
+                    break
+            if match is None:
+                unpaired.append(position)
+            else:
+                taken.add(match)
+                paired.append((position, match))
+        if not paired and self.variants and other.variants:
+            paired.append((0, 0))
+            taken.add(0)
+            unpaired.remove(0)
+        pairs = [(self.variants[mine], other.variants[theirs]) for mine, theirs in paired]
+        pairs += [(self.variants[mine], None) for mine in unpaired]
+        pairs += [(None, variant) for position, variant in enumerate(other.variants) if position not in taken]
+        return pairs
@@ -0,0 +1,28 @@
+from common import engine, fetch
+
+
+def counting_request(calls):
+    def request(url, **kwargs):
+        calls.append((url, kwargs))
+        return fetch.make_response(url, b"{}", 200, {"Content-Type": "application/json"})
+    return request
+
+
+def test_rows_sharing_a_url_send_one_request(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fetch, "request", counting_request(calls))
+    rows = [{"url": "https://brand.test/a.json"}, {"url": "https://brand.test/a.json"}, {"url": "https://brand.test/b.json"}]
+    for row in engine.prefetch_rows(rows, lambda row: [row["url"]]):
+        assert fetch.get(row["url"]).status_code == 200
+    assert sorted(url for url, _ in calls) == ["https://brand.test/a.json", "https://brand.test/b.json"]
+
+
+def test_request_options_bypass_the_prefetched_response(monkeypatch):
+    calls = []
+    monkeypatch.setattr(fetch, "request", counting_request(calls))
+    rows = [{"url": "https://brand.test/a.json"}]
+    for row in engine.prefetch_rows(rows, lambda row: [row["url"]]):
+        fetch.get(row["url"], timeout=5)
+    assert sorted(calls, key=lambda call: len(call[1])) == [
+        ("https://brand.test/a.json", {}), ("https://brand.test/a.json", {"timeout": 5}),
+    ]
@@ -0,0 +1,93 @@
+from common import fetch, incremental, parsers, specs, store
+
+PAGE = """<html><head><meta name="csrf-token" content="{token}">
+<script nonce="{token}">var started = {token};</script>
+<script type="application/ld+json">{{"@type": "Product", "sku": "LD-SKU"}}</script></head>
+<body><h1>Night Cream</h1><span class="price">{price}</span>
+<a href="/cart?v={token}">Cart</a></body></html>"""
+
+
+def plan_for(fields, **extra):
+    spec = {
+        "brand": "Incremental", "input_csv": "in.csv", "output_csv": "out.csv", "comparison_csv": "cmp.csv",
+        "source": {"type": "page"}, "fields": fields, **extra,
+    }
+    return specs.compile_plan(spec)
+
+
+URLS = ("https://brand.test/products/cream", "https://regimenpro.test/products/cream")
+
+
+def page_docs(token, price="40.00"):
+    content = PAGE.format(token=token, price=price).encode()
+    response = fetch.make_response(URLS[0], content, 200, {"Content-Type": "text/html"})
+    return {"variant": "", "response": response}, {"variant": "", "product": {"title": "Night Cream", "variants": []}}
+
+
+def page_hash(plan, token, price="40.00", backend=None):
+    brand_doc, regimen_doc = page_docs(token, price)
+    contexts = plan.brand_side.context(brand_doc, backend), plan.regimen_side.context(regimen_doc, backend)
+    return incremental.input_hash(plan.version, URLS, contexts)
+
+
+TARGETED = {
+    "Product Name": {"select": "h1", "in": "page"},
+    "Product Price": {"select": "span.price", "in": "page"},
+    "SKU": {"embedded": "sku"},
+}
+
+
+def test_tokens_outside_the_targeted_elements_are_ignored():
+    plan = plan_for(TARGETED, compare=["Product Name"])
+    assert page_hash(plan, "1700000000") == page_hash(plan, "1700000099")
+    assert page_hash(plan, "1700000000") != page_hash(plan, "1700000000", price="45.00")
+    for backend in parsers.available_backends():
+        assert page_hash(plan, "1", backend=backend) == page_hash(plan, "2", backend=backend)
+
+
+def test_whole_page_sides_hash_the_whole_body():
+    plan = plan_for({"Product Name": {"text": "spaced", "in": "page"}}, compare=["Product Name"])
+    assert plan.brand_side.page_reads is None
+    assert page_hash(plan, "1700000000") != page_hash(plan, "1700000099")
+
+
+def test_parse_reuses_the_latest_complete_runs_product(tmp_path, monkeypatch):
+    plan = plan_for(TARGETED, compare=["Product Name"])
+    path = str(tmp_path / "results.sqlite3")
+
+    def stored_run(status, hashes):
+        run = store.Run(plan, path)
+        for input_hash in hashes:
+            run.db.execute(
+                "INSERT INTO products (run_id, brand, url, input_hash) VALUES (?, ?, ?, ?)",
+                (run.id, plan.brand, URLS[0], input_hash),
+            )
+        run.finish(status)
+        return run.id
+
+    stored_run("complete", ["a"])
+    unchanged = page_hash(plan, "1700000000")
+    latest = stored_run("complete", ["b", unchanged])
+    stored_run("interrupted", ["c"])
+
+    reuse_from = (path, store.Run(plan, path).reuse_run())
+    assert reuse_from[1] == latest
+    assert store.reused_product(reuse_from, plan.brand, "b")[1] == latest
+    assert store.reused_product(reuse_from, plan.brand, "a") is None
+    assert store.reused_product(reuse_from, plan.brand, "c") is None
+
+    # A new nonce: reused without reading the fields
+    parsed = plan.parse(page_docs("1700000099") + (URLS,), reuse_from)
+    assert parsed["input_hash"] == unchanged
+    assert parsed["reused"][1] == latest
+    assert "brand" not in parsed
+
+    # The hash and the fields read one partial parse of a changed page
+    parses = []
+    page = parsers.page
+    monkeypatch.setattr(parsers, "page", lambda *args, **kwargs: parses.append(kwargs) or page(*args, **kwargs))
+    changed = plan.parse(page_docs("1700000099", price="45.00") + (URLS,), reuse_from)
+    assert parses == [{"only": plan.brand_side.page_targets, "backend": None}]
+    assert "reused" not in changed
+    assert changed["brand"]["Product Price"] == "45.00"
+    assert changed["input_hash"] == page_hash(plan, "1", price="45.00")
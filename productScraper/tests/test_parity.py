@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from common import fetch, parity, parsers
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "parity")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+URL = "https://example.test/products/fixture"
+
+# (brand script, side, recorded document, a few of the values its rules read)
+CASES = [
+    ("AO2_Clear/AO2_Clear.py", "brand", "ao2_clear.html", {
+        "SKU": "ao2-gc-150",
+        "Product Price": "1048.00",
+        "Ingredients": "water (aqua), glycerin, sodium cocoyl isethionate, perfluorodecalin (oxygen carrier), allantoin",
+    }),
+    ("AO2_Clear/AO2_Clear.py", "regimenpro", "ao2_regimenpro.html", {
+        "Ingredients": "water (aqua), glycerin, sodium cocoyl isethionate, perfluorodecalin (oxygen carrier), allantoin",
+    }),
+    ("Alastin/alastin.py", "brand", "alastin.html", {
+        "Product Price": "195.00",
+        "Benefits": "Improves the look of firmness & elasticity, Reduces the appearance of fine lines, Supports a smoother texture",
+    }),
+    ("Alastin/alastin.py", "regimenpro", "regimenpro_product.json", {
+        "Product Description": "A powerful daily serum thatsupportsskin's natural renewal.",
+    }),
+    ("HydroPeptide/hydropeptide.py", "brand", "hydropeptide.html", {
+        "Product Name": "Power Serum",
+        "Product Price": "145.00",
+        "SKU": "PS-30",
+        "Benefits": "Lifts & firms, Smooths wrinkles",
+        "Skin Concerns": "Fine Lines, Loss of Firmness",
+    }),
+    ("CLn_Skin_Care/CLn_Skin.py", "brand", "cln_product.json", {
+        "Ingredients": "Water, Sodium Hypochlorite, Sodium Chloride",
+    }),
+    ("Dermasensa/Dermasensa.py", "brand", "dermasensa_product.json", {
+        "Product Description": "Encapsulated retinol. For nightly use.",
+        "Ingredients": "Squalane,Retinol, Tocopherol",
+        "Expert Tip": "Start twice weekly.",
+    }),
+    ("Ourself/ourself.py", "brand", "ourself_product.json", {
+        "Product Description": "A rich cream that restores the skin barrier. ",
+    }),
+    ("Ourself/ourself.py", "regimenpro", "regimenpro_product.json", {
+        "Product Description": "A powerful daily serum that supports skin's natural renewal.",
+    }),
+    ("Revision/revision.py", "brand", "revision_product.json", {
+        "Product Description": "Neck firming cream & more.",
+    }),
+    ("Sente/sente.py", "brand", "revision_product.json", {
+        "Product Description": "Neck firming cream & more.",
+    }),
+]
+
+
+def side_of(script, side_name):
+    plan = parity.brand_plan(os.path.join(ROOT, script))
+    return plan.brand_side if side_name == "brand" else plan.regimen_side
+
+
+def recorded_doc(side, name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        body = f.read()
+    if name.endswith(".json"):
+        return {"variant": "", "product": json.loads(body)["product"]}
+    response = fetch.make_response(URL, body, 200, {"Content-Type": "text/html; charset=utf-8"})
+    return side.page_doc(URL, response, {"variant": ""})
+
+
+@pytest.mark.parametrize("script, side_name, name, expected", CASES)
+def test_backends_read_the_same_fields(script, side_name, name, expected):
+    side = side_of(script, side_name)
+    doc = recorded_doc(side, name)
+
+    values = parity.side_values(side, doc, parity.REFERENCE, False)
+    assert values["(notes)"] == []
+    assert {column: values[column] for column in expected} == expected
+    # Every installed backend, fully and (BeautifulSoup backends) partially parsed
+    assert parity.compare(side, doc) == []
+
+
+def test_page_sides_are_also_checked_partially():
+    side = side_of("HydroPeptide/hydropeptide.py", "brand")
+    ways = parity.parses(side, parsers.available_backends())
+    assert ("html.parser (partial)", "html.parser", True) in ways
+
+
+@pytest.mark.skipif("lxml" not in parsers.available_backends(), reason="lxml is not installed")
+def test_compare_reports_differing_backends():
+    # html.parser nests an unclosed <p> inside the one before it; lxml closes it
+    side = side_of("Sente/sente.py", "brand")
+    doc = {"variant": "", "product": {"title": "T", "body_html": "<p>One<p>Two", "variants": [{"sku": "S"}]}}
+    differences = parity.compare(side, doc, ["html.parser", "lxml"])
+    assert differences == [("lxml", "Product Description", "OneTwo", "One")]
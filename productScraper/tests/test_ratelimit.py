@@ -0,0 +1,25 @@
+import threading
+
+import pytest
+import requests
+
+from common import ratelimit
+
+
+def test_other_errors_give_the_host_slot_back(monkeypatch):
+    limiter = ratelimit.HostLimiter(concurrency=2)
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda url: limiter)
+
+    def broken_body():
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            ratelimit.send("https://brand.test/products/cream.json", broken_body)
+    assert limiter.in_flight == 0
+    assert limiter.concurrency == 2
+
+    # A following request to the host still gets a slot
+    acquired = threading.Event()
+    threading.Thread(target=lambda: (limiter.acquire(), acquired.set()), daemon=True).start()
+    assert acquired.wait(5)
@@ -0,0 +1,292 @@
+import pickle
+
+import pytest
+
+from common import fetch, specs
+
+BODY = (
+    "<div><p class='lead'>  First paragraph. </p><p></p><p>Second <b>bold</b> paragraph.</p>"
+    "<span>Side note</span><a class='buy' href='/buy?x=1'>Buy</a>"
+    "<h3>Key Ingredients</h3><div>Water, Glycerin</div>"
+    "<table><tr><th>Size</th><td>1 oz</td></tr><tr><th>Ingredients</th><td>Squalane</td></tr></table>"
+    "<dl><dt>How to Use</dt><dd>Apply nightly.</dd><dt>Ingredients list</dt><dd>Retinol</dd></dl>"
+    "<ul class='benefits'><li><span>Firms</span></li><li>No span</li><li><span> Smooths </span></li></ul>"
+    "</div>"
+)
+
+PRODUCT = {
+    "id": 10,
+    "title": "  Night Cream ",
+    "body_html": BODY,
+    "variants": [
+        {"id": 1, "title": "1 oz", "sku": "NC-1", "price": "40.00", "barcode": "111"},
+        {"id": 2, "title": "2 oz", "sku": "NC-2", "price": "70.00", "barcode": "222"},
+    ],
+}
+
+PAGE = b"""<html><head><meta charset="utf-8">
+<script type="application/ld+json">{"@type": "Product", "sku": "LD-SKU"}</script></head>
+<body><h1>Page Title</h1><p class="product__description">Page description.</p>
+<meta itemprop="price" content="40.00">
+<div class="product__details-column"><p class="product__details-title">Skin Concern</p>
+<ul class="product__details-list"><li class="product__details-item"><span>Dryness</span></li></ul></div>
+<div class="product__details-column"><p class="product__details-title">Benefits</p>
+<ul class="product__details-list"><li class="product__details-item"><span>Glow</span></li></ul></div>
+<h2>Ingredients</h2><div>Page water</div>
+</body></html>"""
+
+
+def spec(**overrides):
+    base = {"brand": "Test", "input_csv": "in.csv", "output_csv": "out.csv", "comparison_csv": "cmp.csv"}
+    base.update(overrides)
+    return base
+
+
+def product_doc(product=PRODUCT, variant=""):
+    return {"variant": variant, "product": product}
+
+
+def page_doc(content=PAGE, product=None):
+    response = fetch.make_response("https://brand.test/products/cream", content, 200, {"Content-Type": "text/html"})
+    return {"variant": "", "response": response, "product": product}
+
+
+def read(field, doc=None, **extra):
+    # The value one field spec reads from doc
+    plan = specs.compile_plan(spec(fields={"Value": field}, **extra))
+    return plan.brand_side.read(doc or product_doc()).values["Value"]
+
+
+# === compile_plan ===
+def test_default_plan_is_a_shopify_plan():
+    plan = specs.compile_plan(spec())
+    assert plan.brand_side.type == "shopify"
+    assert plan.brand_side.url_style == "path"
+    assert plan.compare == list(specs.SHOPIFY_FIELDS)
+    assert plan.scraped_fieldnames == ["Product URL", *specs.SHOPIFY_FIELDS, "Date/Time Captured"]
+    assert plan.comparison_fieldnames == [
+        "Product URL", "Field", "Test Value", "RegimenPro Value", "Match?", "Date/Time Captured",
+    ]
+    assert plan.brand_side.fetch_urls("https://brand.test/products/cream?variant=2") == [
+        "https://brand.test/products/cream.json"
+    ]
+
+
+def test_plan_options():
+    plan = specs.compile_plan(spec(
+        label="Brand",
+        fields={"A": {"product": "title"}, "B": {"product": "handle"}},
+        regimenpro={"fields": {"A": {"product": "vendor"}}},
+        compare=["B", "A", "Not a field"],
+        labels={"yes": "Y"},
+        timestamp=False,
+        admin_url=True,
+    ))
+    assert plan.compare == ["B", "A"]
+    assert plan.labels["yes"] == "Y" and plan.labels["no"] == specs.LABELS["no"]
+    assert plan.comparison_fieldnames == [
+        "Product URL", "Shopify Admin URL", "Field", "Brand Value", "RegimenPro Value", "Match?",
+    ]
+    # RegimenPro reads its own rule for A and reuses the brand's for B
+    values = plan.regimen_side.read(product_doc({**PRODUCT, "vendor": "V", "handle": "h"})).values
+    assert values == {"A": "V", "B": "h"}
+
+
+def test_compiled_plans_are_shared_with_pool_workers():
+    plan = specs.compile_plan(spec(brand="Pickled"))
+    assert pickle.loads(pickle.dumps(plan)) is plan
+
+
+def test_page_targets():
+    side = specs.compile_plan(spec(source={"type": "page"}, fields={
+        "A": {"select": "h1", "in": "page"},
+        "B": {"select": ["div.product__details-column", "ul"], "items": "li", "in": "page"},
+        "C": {"after": "h2", "contains": "ingredients", "next": "div", "in": "page"},
+        "D": {"embedded": "sku"},
+        "E": {"text": "strip"},
+    })).brand_side
+    assert side.page_targets == ["h1", "div.product__details-column", "h2 + div", "meta[itemprop=sku]"]
+
+    whole_page = specs.compile_plan(spec(fields={"A": {"text": "strip", "in": "page"}})).brand_side
+    assert whole_page.page_targets is None
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError):
+        specs.compile_plan(spec(fields={"A": {"nothing": 1}}))
+
+
+# === Rule kinds ===
+def test_product_and_variant_rules():
+    assert read({"product": "id"}) == "10"
+    assert read({"variant": "sku"}) == "NC-1"
+    assert read({"product": "nope"}) == "N/A"
+
+
+def test_variant_column_selects_the_variant():
+    field = {"variant": "sku"}
+    assert read(field, product_doc(variant="2 oz")) == "NC-2"
+    plan = specs.compile_plan(spec(fields={"Value": field}))
+    ctx = plan.brand_side.read(product_doc(variant="5 oz"))
+    assert ctx.values["Value"] == "NC-1"
+    assert ctx.notes == ["⚠️ No matching size found for '5 oz' — using default variant."]
+
+
+def test_text_modes():
+    body = {**PRODUCT, "body_html": "<p> A <b>b</b> </p><p>C</p>"}
+    assert read({"text": "raw"}, product_doc(body)) == " A b C"
+    assert read({"text": "strip"}, product_doc(body)) == "AbC"
+    assert read({"text": "spaced"}, product_doc(body)) == "A b C"
+    assert read({"text": "strip", "nonempty": True}, product_doc({**PRODUCT, "body_html": "<p> </p>"})) == "N/A"
+
+
+def test_unescape():
+    escaped = {**PRODUCT, "body_html": "&lt;p&gt;Hi &amp;amp; bye&lt;/p&gt;"}
+    assert read({"select": "p"}, product_doc(escaped), source={"type": "shopify", "unescape": True}) == "Hi & bye"
+
+
+def test_select_rule():
+    assert read({"select": "p"}) == "First paragraph."
+    assert read({"select": "p", "text": "raw"}) == "  First paragraph. "
+    assert read({"select": "p", "nonempty": True}) == "First paragraph."
+    assert read({"select": "p", "unless": ["first"]}) == ""
+    assert read({"select": "p", "join": " | "}) == "First paragraph. |  | Secondboldparagraph."
+    assert read({"select": "a.buy", "attr": "href"}) == "/buy?x=1"
+    assert read({"select": ["table", "td"]}) == "1 oz"
+    assert read({"select": "p.missing"}) == "N/A"
+
+
+def test_select_falls_back_through_rules():
+    assert read([{"select": "p.missing"}, {"select": "span"}]) == "Side note"
+
+
+def test_after_rule():
+    assert read({"after": "h3", "contains": "ingredient", "next": "div"}) == "Water, Glycerin"
+    assert read({"after": "th", "contains": "ingredient", "next": "td", "sibling": True}) == "Squalane"
+    # Any text node mentioning the word: the element after its parent <h3>
+    assert read({"after": None, "contains": "key ingredients"}) == "Water, Glycerin"
+    assert read({"after": "h3", "contains": "directions", "next": "div"}) == "N/A"
+
+
+def test_accordion_rule():
+    rule = {"accordion": ("dt", "dd"), "labels": ["use", "ingredient"]}
+    assert read({**rule, "label": "use"}) == "Apply nightly."
+    assert read({**rule, "label": "ingredient"}) == "Retinol"
+    assert read({"accordion": ("dt", "dd"), "labels": ["expert"], "label": "expert"}) == "N/A"
+
+
+def test_items_rule():
+    assert read({"select": "ul.benefits", "items": "li"}) == "Firms, No span, Smooths"
+    assert read({"select": "ul.benefits", "items": "li", "item": "span", "join": "; "}) == "Firms; Smooths"
+
+
+def test_page_rules():
+    side = specs.compile_plan(spec(source={"type": "page"}, fields={
+        "Name": {"select": "h1", "in": "page"},
+        "Price": {"select": "meta[itemprop=price]", "attr": "content", "in": "page"},
+        "Concerns": {
+            "select": ["div.product__details-column", "ul.product__details-list"],
+            "items": "li.product__details-item", "item": "span",
+            "where": ("p.product__details-title", "SKIN CONCERN"), "in": "page",
+        },
+        "Ingredients": {"after": "h2", "contains": "ingredients", "next": "div", "in": "page"},
+        "SKU": {"embedded": "sku"},
+    })).brand_side
+    for partial in (True, False):
+        assert side.read(page_doc(), partial=partial).values == {
+            "Name": "Page Title", "Price": "40.00", "Concerns": "Dryness",
+            "Ingredients": "Page water", "SKU": "LD-SKU",
+        }
+
+
+# === Defaults, cleanup and errors ===
+def test_defaults_and_cleans():
+    assert read({"from": {"select": "h6"}, "default": "none"}) == "none"
+    assert read({"product": "nope"}, default="") == ""
+    assert read({"from": {"product": "title"}, "clean": ["strip"]}) == "Night Cream"
+    assert read({"from": {"variant": "price"}, "clean": [("remove", ".0")]}) == "4"
+    assert read({"from": {"select": "p"}, "clean": [("rstrip", ".")]}) == "First paragraph"
+    assert read({"from": {"text": "spaced"}, "clean": [("cut", ["key ingredients"])]}) == (
+        "First paragraph. Second bold paragraph. Side note Buy "
+    )
+    assert read({"from": {"select": "p", "text": "raw"}, "clean": ["normalize"]}) == "first paragraph."
+
+
+def test_drop_prefix_clean_uses_fields_read_before_it():
+    plan = specs.compile_plan(spec(fields={
+        "Name": {"from": {"product": "title"}, "clean": ["strip"]},
+        "Description": {"from": {"select": "p"}, "clean": [("drop_prefix", "Name")]},
+    }))
+    doc = product_doc({**PRODUCT, "body_html": "<p>Night Cream: rich and soft</p>"})
+    assert plan.brand_side.read(doc).values["Description"] == "rich and soft"
+
+
+def test_reader_errors_become_notes():
+    plan = specs.compile_plan(spec(fields={"A": {"from": {"variant": "sku"}, "clean": [("cut", [])]}}))
+    plan.brand_side.fields[0][3].append(lambda value, values: 1 / 0)
+    ctx = plan.brand_side.read(product_doc())
+    assert ctx.values["A"] == "N/A"
+    assert ctx.notes == ["❌ Error reading Test A: division by zero"]
+
+
+def test_fetch_errors_fill_missing():
+    plan = specs.compile_plan(spec(missing="Not found"))
+    ctx = plan.brand_side.read({"error": "⚠️ Failed to fetch Test JSON: 404"})
+    assert set(ctx.values.values()) == {"Not found"}
+    assert ctx.notes == ["⚠️ Failed to fetch Test JSON: 404"]
+
+
+# === Matchers ===
+def match(matcher, a, b, **extra):
+    plan = specs.compile_plan(spec(fields={"A": {"product": "a"}}, matchers={"A": matcher}, **extra))
+    values = plan.parse((product_doc({"a": a, "variants": []}), product_doc({"a": b, "variants": []}), None))
+    return plan.match([values["comparisons"]])[0][0][-1]
+
+
+@pytest.mark.parametrize("matcher, a, b, expected", [
+    ("exact", " Cream ", "Cream", "✅ Yes"),
+    ("exact", "Cream", "cream", "❌ No"),
+    ("casefold", "Cream", "CREAM", "✅ Yes"),
+    ("words", "Night  Cream\n", "night cream", "✅ Yes"),
+    ("normalized", " Night\nCream", "night cream", "❌ No"),
+    ("normalized", " Night,\nCream", "night,cream", "✅ Yes"),
+    ("price", "$1,040.00", "1040", "⚠️ Invalid price format"),
+    ("price", "$40.00", "40", "✅ Yes"),
+    ("price", "N/A", "40.00", "⚠️ Invalid price format"),
+    (("price", "$,"), "$1,040.00", "1040", "✅ Yes"),
+    (("fuzzy", 0.8), "Night cream for dry skin", "Night cream for dry skin.", "✅ Yes"),
+    (("fuzzy", 0.8), "Night cream", "Day lotion", "❌ No"),
+    (("fuzzy", 0.8, True), "Night cream", "Day lotion", "❌ No (10% match)"),
+    # 17 of 20 characters in common: a ratio of exactly 0.85
+    (("fuzzy", 0.85), "abcdefghijklmnopqrst", "abcdefghijklmnopqxyz", "❌ No"),
+    (("fuzzy", 0.85, True), "abcdefghijklmnopqrst", "abcdefghijklmnopqxyz", "❌ No (85% match)"),
+    (("fuzzy", 0.85, False, True), "abcdefghijklmnopqrst", "abcdefghijklmnopqxyz", "✅ Yes"),
+    ("list", "water, glycerin", "Glycerin; Water", "✅ Yes (reordered)"),
+    (("list", True), "water, glycerin", "glycerin, water", "❌ No (reordered)"),
+    ("list", "water, glycerin, urea", "water, glycerin, niacinamide", "❌ No (added: niacinamide; removed: urea)"),
+    ("list", "water", "N/A", "❌ No"),
+])
+def test_matchers(matcher, a, b, expected):
+    assert match(matcher, a, b) == expected
+
+
+def test_compare_clean_and_labels():
+    assert match("exact", "Cream •", "Cream", compare_clean=[("rstrip", " •")], labels={"yes": "Y"}) == "Y"
+
+
+def test_variant_pairs_are_compared_per_variant():
+    plan = specs.compile_plan(spec())
+    regimen = {**PRODUCT, "variants": [
+        {"id": 9, "title": "2 oz", "sku": "NC-2", "price": "75.00"},
+        {"id": 8, "title": "1 oz", "sku": "NC-1", "price": "40.00"},
+    ]}
+    brand = {**PRODUCT, "variants": PRODUCT["variants"] + [{"id": 3, "title": "3 oz", "sku": "NC-3", "price": "90.00"}]}
+    parsed = plan.parse((product_doc(brand), product_doc(regimen), None))
+    rows = plan.match([parsed["comparisons"]])[0]
+    prices = [(field, match) for field, column, _, _, match in rows if column == "Product Price"]
+    assert prices == [
+        ("Product Price (1 oz)", "✅ Yes"),
+        ("Product Price (2 oz)", "❌ No"),
+        ("Product Price (3 oz)", "⚠️ No matching variant"),
+    ]
+    assert [snapshot[3] for snapshot in parsed["variants"]["regimenpro"]] == ["NC-2", "NC-1"]